@@ -0,0 +1,165 @@
+# cartridge header and ROM library
+
+# Cartridge Header
+# Start End     Description
+# 0100  0103    Entry point
+# 0104  0133    Nintendo logo
+# 0134  0143    Title (CGB flag at 0143)
+# 0144  0146    Licensee code and SGB flag
+# 0147  0147    Cartridge type
+# 0148  0148    ROM size
+# 0149  0149    RAM size
+# 014A  014C    Destination, old licensee code and version
+# 014D  014D    Header checksum
+# 014E  014F    Global checksum
+
+import hashlib, json, os
+# addresses of cartridge header
+LOGO_ADDR            = 0x0104
+TITLE_ADDR           = 0x0134
+TYPE_ADDR            = 0x0147
+ROM_SIZE_ADDR        = 0x0148
+RAM_SIZE_ADDR        = 0x0149
+VERSION_ADDR         = 0x014C
+HEADER_CHECKSUM_ADDR = 0x014D
+GLOBAL_CHECKSUM_ADDR = 0x014E
+HEADER_END           = 0x0150
+
+LOGO = bytes((
+    0xCE, 0xED, 0x66, 0x66, 0xCC, 0x0D, 0x00, 0x0B, 0x03, 0x73, 0x00, 0x83, 0x00, 0x0C, 0x00, 0x0D,
+    0x00, 0x08, 0x11, 0x1F, 0x88, 0x89, 0x00, 0x0E, 0xDC, 0xCC, 0x6E, 0xE6, 0xDD, 0xDD, 0xD9, 0x99,
+    0xBB, 0xBB, 0x67, 0x63, 0x6E, 0x0E, 0xEC, 0xCC, 0xDD, 0xDC, 0x99, 0x9F, 0xBB, 0xB9, 0x33, 0x3E
+))
+RAM_SIZES = {0x00: 0, 0x01: 0x800, 0x02: 0x2000, 0x03: 0x8000, 0x04: 0x20000, 0x05: 0x10000}
+# cartridge type to (controller, battery, clock)
+CART_TYPES = {
+    0x00: ('ROM',  False, False), 0x08: ('ROM',  False, False), 0x09: ('ROM',  True,  False),
+    0x01: ('MBC1', False, False), 0x02: ('MBC1', False, False), 0x03: ('MBC1', True,  False),
+    0x0F: ('MBC3', True,  True ), 0x10: ('MBC3', True,  True ), 0x11: ('MBC3', False, False),
+    0x12: ('MBC3', False, False), 0x13: ('MBC3', True,  False),
+    0x19: ('MBC5', False, False), 0x1A: ('MBC5', False, False), 0x1B: ('MBC5', True,  False),
+    0x1C: ('MBC5', False, False), 0x1D: ('MBC5', False, False), 0x1E: ('MBC5', True,  False)
+}
+
+class Header(object):
+
+    FIELDS = (
+        'title', 'cartType', 'mbc', 'battery', 'rtc', 'romSize', 'ramSize', 'version',
+        'logoValid', 'headerChecksum', 'headerValid', 'globalChecksum'
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, rom) -> None:
+        # only the first 0x150 bytes of rom are read
+        assert len(rom) >= HEADER_END, f'!!! ROM of {len(rom)} bytes is too short for a header !!!'
+        data = bytes(rom[:HEADER_END])
+        self.title = data[TITLE_ADDR:TITLE_ADDR + 0x10].split(b'\x00')[0].decode('ascii', 'replace').strip()
+        self.cartType = data[TYPE_ADDR]
+        self.mbc, self.battery, self.rtc = CART_TYPES.get(self.cartType, (None, False, False))
+        self.romSize = 0x8000 << data[ROM_SIZE_ADDR] if data[ROM_SIZE_ADDR] <= 0x08 else 0
+        self.ramSize = RAM_SIZES.get(data[RAM_SIZE_ADDR], 0)
+        self.version = data[VERSION_ADDR]
+        self.logoValid = data[LOGO_ADDR:LOGO_ADDR + len(LOGO)] == LOGO
+
+        checksum = 0
+        for addr in range(TITLE_ADDR, HEADER_CHECKSUM_ADDR):
+            checksum = (checksum - data[addr] - 1) & 0xFF
+        self.headerChecksum = data[HEADER_CHECKSUM_ADDR]
+        self.headerValid = checksum == self.headerChecksum
+        self.globalChecksum = (data[GLOBAL_CHECKSUM_ADDR] << 8) | data[GLOBAL_CHECKSUM_ADDR + 1]
+
+    @property
+    def valid(self) -> bool:
+        # what the boot rom checks, plus a controller we can emulate
+        return self.logoValid and self.headerValid and self.mbc is not None
+
+    def checkGlobal(self, rom) -> bool:
+        # the global checksum is not verified by hardware, it needs a pass over the whole ROM
+        total = sum(rom) - rom[GLOBAL_CHECKSUM_ADDR] - rom[GLOBAL_CHECKSUM_ADDR + 1]
+        return total & 0xFFFF == self.globalChecksum
+
+    def toDict(self) -> dict:
+        return {field: getattr(self, field) for field in Header.FIELDS}
+
+class Library(object):
+    # index of a directory of ROMs keyed by SHA-1, files are only read again when their size or mtime change
+
+    INDEX_NAME = '.pygb_index.json'
+    EXTENSIONS = ('.gb', '.gbc')
+    __slots__ = ('root', 'indexPath', 'entries', 'files')
+
+    def __init__(self, root: str, indexPath: str=None) -> None:
+        self.root = root
+        self.indexPath = indexPath or os.path.join(root, Library.INDEX_NAME)
+        # sha1 -> header info and paths of a ROM, copies of the same ROM share an entry
+        self.entries = {}
+        # path -> sha1, size and mtime of each file
+        self.files = {}
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.indexPath): return
+        with open(self.indexPath, 'r') as f:
+            index = json.load(f)
+        # an index of another layout is dropped, the next scan reads every file again
+        if 'files' not in index or 'roms' not in index: return
+        self.entries = index['roms']
+        self.files = index['files']
+
+    def save(self) -> None:
+        tmpPath = f'{self.indexPath}.tmp'
+        with open(tmpPath, 'w') as f:
+            json.dump({'files': self.files, 'roms': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmpPath, self.indexPath)
+
+    def scan(self) -> None:
+        found = set()
+        for dirPath, _, fileNames in os.walk(self.root):
+            for fileName in fileNames:
+                if not fileName.lower().endswith(Library.EXTENSIONS): continue
+                path = os.path.join(dirPath, fileName)
+                found.add(path)
+                stat = os.stat(path)
+                info = self.files.get(path)
+                if info and info['size'] == stat.st_size and info['mtime'] == stat.st_mtime and info['sha1'] in self.entries:
+                    continue
+                self.add(path, stat)
+        # forget files that were removed
+        for path in set(self.files) - found:
+            self.forget(path)
+
+    def add(self, path: str, stat: os.stat_result) -> None:
+        with open(path, 'rb') as f:
+            rom = f.read()
+        sha1 = hashlib.sha1(rom).hexdigest()
+        # the file may have held another ROM before
+        if path in self.files:
+            self.forget(path)
+        entry = self.entries.get(sha1)
+        if entry is None:
+            if len(rom) < HEADER_END:
+                entry = {'valid': False}
+            else:
+                header = Header(rom)
+                entry = header.toDict()
+                entry['valid'] = header.valid and header.romSize <= len(rom)
+                entry['globalValid'] = header.checkGlobal(rom)
+            entry.update(sha1=sha1, paths=[])
+            self.entries[sha1] = entry
+        entry['paths'] = sorted(entry['paths'] + [path])
+        self.files[path] = {'sha1': sha1, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def forget(self, path: str) -> None:
+        sha1 = self.files.pop(path)['sha1']
+        entry = self.entries.get(sha1)
+        if entry is None: return
+        entry['paths'] = [other for other in entry['paths'] if other != path]
+        # the last copy of a ROM takes its entry along
+        if not entry['paths']:
+            del self.entries[sha1]
+
+    def find(self, sha1: str) -> dict:
+        return self.entries.get(sha1)
+
+    def roms(self, validOnly: bool=True) -> list:
+        return [entry for entry in self.entries.values() if entry['valid'] or not validOnly]
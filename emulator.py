@@ -1,45 +1,104 @@
 # mother board
+import time
 from z80 import Z80
 from ppu import INSTRUCTION, PPU
-from mmu import MMU
+from mmu import MMU, BIOS_PATH, loadBios
 from timer import Timer
-from utils import toHex
+from governor import Governor, FRAME_RATE
+from utils import toHex, NEVER
 
 class Emulator(object):
 
     __slots__ = (
         'z80', 'ppu', 'mmu', 'timer',
-        'LOG', 'frames', 'paused'
+        'rom', 'LOG', 'frames', 'paused', 'governor',
+        'cycles', 'nextEvent', 'resetState'
     )
 
-    def __init__(self, rom: str, skipBios: bool=False, nostalgic: bool=False) -> None:
+    def __init__(
+        self, rom: str, skipBios: bool=False, nostalgic: bool=False,
+        savePath: str=None, saveInterval: int=60, biosPath: str=BIOS_PATH, speed: float=None,
+        frameskip: int=0, threaded: bool=False
+    ) -> None:
+        # the boot rom is only run when a valid one is found
+        bios = None if skipBios else loadBios(biosPath)
+        self.rom = rom
         # main units
         self.z80 = Z80(self)
-        self.ppu = PPU(self, nostalgic)
-        self.mmu = MMU(self, rom)
+        self.ppu = PPU(self, nostalgic, frameskip, threaded)
+        self.mmu = MMU(self, rom, savePath, saveInterval, bios)
         self.timer = Timer(self)
         # log dict
         self.LOG = {}
         # global states
         self.frames = 0
         self.paused = False
+        # emulated time, timer and ppu catch up with it when an event is due
+        self.cycles = 0
+        self.nextEvent = NEVER
+        self.schedule()
+        # snapshot restored by reset, set by the pool
+        self.resetState = None
+        # frames are paced when a speed is given (1.0 for real time, 0 for turbo), else run as fast as possible
+        self.governor = None if speed is None else Governor(self, speed)
 
-        self.initData(skipBios)
+        if bios is None:
+            self.fastBoot()
         print(INSTRUCTION)
     
     def step(self) -> None:
-        if self.mmu.dmaInProgress:
-            cyclesPassed = self.mmu.step()
-        else:
-            cyclesPassed = self.z80.step()
+        cyclesPassed = self.z80.step()
         self.takeLog()
-        self.timer.tick(cyclesPassed)
-        self.ppu.tick(cyclesPassed)
+        self.cycles += cyclesPassed
+        if self.cycles >= self.nextEvent:
+            self.sync()
+    
+    def sync(self) -> None:
+        if self.cycles >= self.timer.nextEvent:
+            self.timer.sync()
+        if self.cycles >= self.ppu.nextEvent:
+            self.ppu.sync()
+        if self.cycles >= self.mmu.nextEvent:
+            self.mmu.sync()
+    
+    def schedule(self) -> None:
+        self.nextEvent = min(self.timer.nextEvent, self.ppu.nextEvent, self.mmu.nextEvent)
     
     def run(self, frames: int=-1) -> None:
         while self.frames != frames:
-            self.step()
+            if self.paused:
+                self.ppu.handleEvents()
+                time.sleep(1 / FRAME_RATE)
+                if self.governor is not None:
+                    self.governor.rebase()
+                continue
+            # a frame, or as long as one while the lcd is off
+            frame, end = self.frames, self.cycles + PPU.FRAME_TIME
+            while self.frames == frame and self.cycles < end:
+                self.step()
+            # inputs are taken once per frame
             self.ppu.handleEvents()
+            if self.governor is not None:
+                self.governor.pace()
+    
+    def snapshot(self) -> tuple:
+        # whole machine state, restoring it only copies memory back in bulk
+        return (
+            self.z80.snapshot(), self.ppu.snapshot(), self.mmu.snapshot(), self.timer.snapshot(),
+            self.frames, self.paused, self.cycles
+        )
+
+    def restore(self, state: tuple) -> None:
+        z80, ppu, mmu, timer, self.frames, self.paused, self.cycles = state
+        self.z80.restore(z80)
+        self.ppu.restore(ppu)
+        self.mmu.restore(mmu)
+        self.timer.restore(timer)
+        self.schedule()
+
+    def reset(self) -> None:
+        assert self.resetState is not None, '!!! no snapshot to reset to !!!'
+        self.restore(self.resetState)
     
     def read(self, addr: int) -> int:
         return self.mmu.read(addr)
@@ -47,41 +106,29 @@ class Emulator(object):
     def write(self, addr: int, byte: int) -> None:
         self.mmu.write(addr, byte)
     
-    def initData(self, skipBios: bool) -> None:
-        if not skipBios: return
-
+    def fastBoot(self) -> None:
+        # start at 0x100 in the state the boot rom leaves, no cycle is emulated
         self.z80.PC = 0x100
         self.z80.SP = 0xFFFE
         self.z80.A = 0x01
+        # H and C are set unless the header checksum is 0
+        self.z80.F = 0xB0 if self.mmu.mbc.header.headerChecksum else 0x80
         self.z80.B = 0x00
         self.z80.C = 0x13
         self.z80.D = 0x00
         self.z80.E = 0xD8
-        self.z80.F = 0xB0
         self.z80.H = 0x01
         self.z80.L = 0x4D
 
-        self.write(0xFF10, 0x80)
-        self.write(0xFF11, 0xBF)
-        self.write(0xFF12, 0xF3)
-        self.write(0xFF14, 0xBF)
-        self.write(0xFF16, 0x3F)
-        self.write(0xFF19, 0xBF)
-        self.write(0xFF1A, 0x7F)
-        self.write(0xFF1B, 0xFF)
-        self.write(0xFF1C, 0x9F)
-        self.write(0xFF1E, 0xBF)
-        self.write(0xFF20, 0xFF)
-        self.write(0xFF23, 0xBF)
-        self.write(0xFF24, 0x77)
-        self.write(0xFF25, 0xF3)
-        self.write(0xFF26, 0xF1)
-        self.write(0xFF40, 0x91)
-        self.write(0xFF41, 0x05)
-        self.write(0xFF47, 0xFC)
-        self.write(0xFF48, 0xFF)
-        self.write(0xFF49, 0xFF)
-        self.write(0xFF50, 0x01)
+        self.mmu.loadPostBoot()
+        # internal divider of 0xABCC and the lcd at the beginning of line 153
+        self.timer.divBase = self.cycles - 0xABCC
+        self.timer.lastSync = self.cycles
+        self.ppu.frameStart = self.cycles - PPU.FRAME_TIME + PPU.LINE_TIME
+        self.ppu.updateRegisters(self.cycles)
+        self.ppu.reschedule(self.cycles)
+        self.timer.reschedule()
+        self.z80.updateInterrupt()
     
     def takeLog(self) -> None:
         self.LOG['frames'] = self.frames
@@ -0,0 +1,79 @@
+# fork server
+# the parent imports the modules, maps the ROMs and warms their snapshots once, workers are forked
+# from it and share all of that copy-on-write, a worker only owns the pages it dirties
+# (workers should run headless, e.g. with SDL_VIDEODRIVER=dummy)
+import gc, importlib, json, os, signal, socket, sys, threading, traceback
+from pool import Pool
+
+class ForkServer(object):
+
+    __slots__ = ('pool', 'frames', 'sock')
+
+    def __init__(self, roms: list, frames: int=0, prepare=None, **options) -> None:
+        # options of Emulator, snapshots are taken at the given frame or by prepare(emu),
+        # frames are presented on the calling thread so no thread is running when forking
+        options.setdefault('threaded', False)
+        self.pool = Pool(**options)
+        self.frames = frames
+        for rom in roms:
+            self.pool.snapshot(rom, frames, prepare)
+        self.sock = None
+        # objects made so far are left out of garbage collection,
+        # collecting them in a worker would touch their pages and copy them
+        gc.freeze()
+
+    def spawn(self, rom: str, target, args: tuple=(), close: tuple=()) -> int:
+        # target(emu, *args) runs in a new process, whose pid is returned
+        # a thread of the parent, e.g. a presenter, may hold a lock that is never released in the child
+        assert threading.active_count() == 1, f'!!! forking with threads running: {[t.name for t in threading.enumerate()]} !!!'
+        pid = os.fork()
+        if pid:
+            return pid
+
+        code = 0
+        try:
+            # descriptors of the server are not for workers
+            for f in close:
+                f.close()
+            emu = self.pool.acquire(rom, self.frames)
+            target(emu, *args)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # skip the cleanup of the parent, e.g. pygame and atexit handlers
+            os._exit(code)
+
+    def serve(self, path: str) -> None:
+        # requests are lines of json {"rom": ..., "target": "module:function", "args": [...]},
+        # each is answered with the pid of its worker
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        if os.path.exists(path):
+            os.unlink(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen()
+        print(f'*** fork server listening on {path} ***')
+        while True:
+            conn, _ = self.sock.accept()
+            with conn, conn.makefile('rw') as f:
+                for line in f:
+                    request = json.loads(line)
+                    module, name = request['target'].split(':')
+                    target = getattr(importlib.import_module(module), name)
+                    pid = self.spawn(request['rom'], target, tuple(request.get('args', ())), (f, conn, self.sock))
+                    f.write(f'{pid}\n')
+                    f.flush()
+
+def request(path: str, rom: str, target: str, *args) -> int:
+    # ask a fork server for a worker running target (module:function) on rom
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        with sock.makefile('rw') as f:
+            f.write(json.dumps({'rom': rom, 'target': target, 'args': args}) + '\n')
+            f.flush()
+            return int(f.readline())
@@ -0,0 +1,71 @@
+# frame pacing
+# emulated time is held against an absolute wall clock schedule, so errors of sleep do not add up
+import time
+from mbc import CLOCK_RATE
+from ppu import PPU
+# frames per second of the LCD (≈59.73)
+FRAME_RATE = CLOCK_RATE / PPU.FRAME_TIME
+# when further behind than this, the schedule is moved instead of catching up
+MAX_LAG = 0.25
+
+class Governor(object):
+    # speed 1.0 is real time, N runs N times faster, 0 is turbo: unpaced and presenting
+    # at most FRAME_RATE frames per second of wall time
+
+    __slots__ = ('emu', 'speed', 'origin', 'originCycles', 'lag', 'lastPresent', 'presented', 'dropped')
+
+    def __init__(self, emu, speed: float=1.0) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.speed = speed
+        # wall clock at originCycles of emulated time
+        self.origin = 0.0
+        self.originCycles = 0
+        # seconds behind the schedule, negative when ahead
+        self.lag = 0.0
+        self.lastPresent = 0.0
+        self.presented = 0
+        self.dropped = 0
+        self.rebase()
+
+    def setSpeed(self, speed: float) -> None:
+        self.speed = speed
+        self.rebase()
+
+    def rebase(self) -> None:
+        # start a new schedule from now, e.g. after a pause
+        self.origin = time.perf_counter()
+        self.originCycles = self.emu.cycles
+        self.lag = 0.0
+
+    def pace(self) -> None:
+        # called once per frame
+        now = time.perf_counter()
+        if self.emu.ppu.present:
+            self.presented += 1
+            self.lastPresent = now
+        else:
+            self.dropped += 1
+
+        if not self.speed:
+            # next frame is only shown when its time has come on the wall clock
+            self.emu.ppu.present = now - self.lastPresent >= 1 / FRAME_RATE
+            self.lag = 0.0
+            return
+
+        self.emu.ppu.present = True
+        target = self.origin + (self.emu.cycles - self.originCycles) / (CLOCK_RATE * self.speed)
+        self.lag = now - target
+        if self.lag < 0:
+            time.sleep(-self.lag)
+        elif self.lag > MAX_LAG:
+            # too slow to keep up, run as fast as possible from here
+            self.origin += self.lag
+
+    def report(self) -> None:
+        mode = 'turbo' if not self.speed else f'{self.speed:g}x'
+        state = 'ahead' if self.lag < 0 else 'behind'
+        print(
+            f'pacing {mode}: {abs(self.lag) * 1000:.1f} ms ({abs(self.lag) * FRAME_RATE:.2f} frames) {state}, '
+            f'{self.presented} frames presented, {self.dropped} skipped'
+        )
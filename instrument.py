@@ -0,0 +1,514 @@
+# optional instrumentation
+# counters are installed by switching the class of a unit to a subclass with counting methods,
+# the plain classes are left untouched so nothing is paid while instrumentation is off
+import json, os, signal, time
+from array import array
+from z80 import OP_MAP, INTR_VECTORS
+
+# names of I/O registers (0xFF00 ~ 0xFFFF)
+IO_NAMES = {
+    0x00: 'P1', 0x01: 'SB', 0x02: 'SC', 0x04: 'DIV', 0x05: 'TIMA', 0x06: 'TMA', 0x07: 'TAC', 0x0F: 'IF',
+    0x10: 'NR10', 0x11: 'NR11', 0x12: 'NR12', 0x13: 'NR13', 0x14: 'NR14',
+    0x16: 'NR21', 0x17: 'NR22', 0x18: 'NR23', 0x19: 'NR24',
+    0x1A: 'NR30', 0x1B: 'NR31', 0x1C: 'NR32', 0x1D: 'NR33', 0x1E: 'NR34',
+    0x20: 'NR41', 0x21: 'NR42', 0x22: 'NR43', 0x23: 'NR44', 0x24: 'NR50', 0x25: 'NR51', 0x26: 'NR52',
+    0x40: 'LCDC', 0x41: 'STAT', 0x42: 'SCY', 0x43: 'SCX', 0x44: 'LY', 0x45: 'LYC', 0x46: 'DMA',
+    0x47: 'BGP', 0x48: 'OBP0', 0x49: 'OBP1', 0x4A: 'WY', 0x4B: 'WX', 0x50: 'BOOT', 0xFF: 'IE'
+}
+# shades of the text heatmap, from cold to hot
+SHADES = ' .:-=+*#%@'
+# opcodes entering and leaving routines
+CALL_OPS = frozenset((0xC4, 0xCC, 0xCD, 0xD4, 0xDC, 0xC7, 0xCF, 0xD7, 0xDF, 0xE7, 0xEF, 0xF7, 0xFF))
+RET_OPS = frozenset((0xC0, 0xC8, 0xC9, 0xD0, 0xD8, 0xD9))
+INTR_NAMES = dict(zip(INTR_VECTORS, ('VBlank', 'STAT', 'Timer', 'Serial', 'Joypad')))
+# subsystem of the host code by module, and by function for the ppu
+MODULE_SUBSYSTEMS = {'z80.py': 'cpu', 'mmu.py': 'mmu', 'mbc.py': 'mmu', 'timer.py': 'timer', 'emulator.py': 'loop'}
+PPU_SUBSYSTEMS = {
+    'render': 'ppu render', 'renderBackground': 'ppu render', 'scroll': 'ppu render', 'renderWindow': 'ppu render',
+    'compose': 'ppu render', 'renderSprites': 'ppu render', 'tileAddr': 'ppu render', 'updateLCD': 'ppu present',
+    'handleEvents': 'events', 'pullButton': 'events'
+}
+
+def swapClass(obj, methods: dict) -> type:
+    # replace methods of a single object, returns its original class
+    base = type(obj)
+    methods['__slots__'] = ()
+    obj.__class__ = type(f'Instrumented{base.__name__}', (base,), methods)
+    return base
+
+def restoreClasses(*pairs) -> None:
+    # undo swapClass for (obj, original class) pairs, all are checked before any is restored:
+    # an object swapped again by another instrument would lose that one's subclass
+    for obj, base in pairs:
+        assert type(obj) is not base and type(obj).__base__ is base, \
+            f'!!! {type(obj).__name__} was swapped by another instrument, uninstall in reverse order !!!'
+    for obj, base in pairs:
+        obj.__class__ = base
+
+def ioName(offset: int) -> str:
+    return IO_NAMES.get(offset, f'FF{offset:02X}')
+
+def loadSymbols(path: str) -> dict:
+    # .sym files of rgbds / no$gmb, lines of 'BB:AAAA name' with ; comments
+    symbols = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split(';')[0].strip()
+            if not line: continue
+            loc, _, name = line.partition(' ')
+            bank, _, addr = loc.partition(':')
+            try:
+                symbols[(int(bank, 16), int(addr, 16))] = name.strip()
+            except ValueError:
+                print(f'*** invalid symbol {line} in {path} ***')
+    return symbols
+
+class MemoryHeatmap(object):
+    # reads and writes per 256-byte page and per address of 0xFF00 ~ 0xFFFF,
+    # accesses to echo RAM count for both the echo and the internal RAM
+
+    __slots__ = ('emu', 'reads', 'writes', 'ioReads', 'ioWrites', 'frames', 'lastFrame', 'mmuClass', 'ppuClass')
+
+    def __init__(self, emu, perFrame: bool=False) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.reads = array('Q', bytes(8 * 0x100))
+        self.writes = array('Q', bytes(8 * 0x100))
+        self.ioReads = array('Q', bytes(8 * 0x100))
+        self.ioWrites = array('Q', bytes(8 * 0x100))
+        # counters of every frame when perFrame is set
+        self.frames = [] if perFrame else None
+        self.lastFrame = None
+        self.mmuClass = self.ppuClass = None
+
+    def install(self) -> None:
+        if self.mmuClass is not None: return
+        reads, writes, ioReads, ioWrites = self.reads, self.writes, self.ioReads, self.ioWrites
+        mmuClass = type(self.emu.mmu)
+
+        def read(mmu, addr: int) -> int:
+            reads[addr >> 8] += 1
+            if addr >= 0xFF00:
+                ioReads[addr & 0xFF] += 1
+            return mmuClass.read(mmu, addr)
+
+        def write(mmu, addr: int, byte: int) -> None:
+            writes[addr >> 8] += 1
+            if addr >= 0xFF00:
+                ioWrites[addr & 0xFF] += 1
+            mmuClass.write(mmu, addr, byte)
+
+        self.mmuClass = swapClass(self.emu.mmu, {'read': read, 'write': write})
+        if self.frames is None: return
+        # counters are taken at every vblank
+        heatmap, ppuClass = self, type(self.emu.ppu)
+        self.lastFrame = self.counters()
+
+        def fire(ppu, t: int) -> None:
+            frames = ppu.emu.frames
+            ppuClass.fire(ppu, t)
+            if ppu.emu.frames != frames:
+                heatmap.endFrame()
+
+        self.ppuClass = swapClass(self.emu.ppu, {'fire': fire})
+
+    def uninstall(self) -> None:
+        if self.mmuClass is None: return
+        pairs = [(self.emu.mmu, self.mmuClass)]
+        if self.ppuClass is not None:
+            pairs.append((self.emu.ppu, self.ppuClass))
+        restoreClasses(*pairs)
+        self.mmuClass = self.ppuClass = None
+
+    def counters(self) -> tuple:
+        return tuple(array('Q', counter) for counter in (self.reads, self.writes, self.ioReads, self.ioWrites))
+
+    def endFrame(self) -> None:
+        # counts of the frame are the difference with the end of last frame
+        now = self.counters()
+        self.frames.append(tuple(
+            array('Q', (a - b for a, b in zip(new, old))) for new, old in zip(now, self.lastFrame)
+        ))
+        self.lastFrame = now
+
+    def hotRegisters(self, count: int=16) -> list:
+        # (name, reads, writes) of the most accessed addresses of 0xFF00 ~ 0xFFFF
+        offsets = sorted(range(0x100), key=lambda offset: -(self.ioReads[offset] + self.ioWrites[offset]))
+        return [
+            (ioName(offset), self.ioReads[offset], self.ioWrites[offset])
+            for offset in offsets[:count] if self.ioReads[offset] + self.ioWrites[offset]
+        ]
+
+    def report(self) -> None:
+        # 16 x 16 pages, a row per 4KB
+        for title, counter in (('reads', self.reads), ('writes', self.writes)):
+            peak = max(counter) or 1
+            print(f'{title} per page (peak {peak}):')
+            for row in range(0x10):
+                cells = ''.join(SHADES[counter[row * 0x10 + col] * (len(SHADES) - 1) // peak] for col in range(0x10))
+                print(f'\t{row:X}000 |{cells}|')
+        print('I/O registers:')
+        for name, reads, writes in self.hotRegisters():
+            print(f'\t{name:<6}{reads:>12} r{writes:>12} w')
+
+    def save(self, path: str) -> None:
+        data = {
+            'pages': {'reads': list(self.reads), 'writes': list(self.writes)},
+            'io': {ioName(offset): [self.ioReads[offset], self.ioWrites[offset]] for offset in range(0x100)},
+        }
+        if self.frames is not None:
+            data['frames'] = [
+                {'reads': list(reads), 'writes': list(writes), 'ioReads': list(ioReads), 'ioWrites': list(ioWrites)}
+                for reads, writes, ioReads, ioWrites in self.frames
+            ]
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+class OpcodeProfile(object):
+    # executions, emulated cycles and host time per opcode (0x100 ~ 0x1FF for the CB prefixed ones)
+    # and executions and cycles per PC, the host time includes the cost of measuring it
+
+    __slots__ = ('emu', 'counts', 'cycles', 'hostTime', 'pcCounts', 'pcCycles', 'z80Class')
+
+    def __init__(self, emu) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.counts = array('Q', bytes(8 * 0x200))
+        self.cycles = array('Q', bytes(8 * 0x200))
+        self.hostTime = array('Q', bytes(8 * 0x200))
+        self.pcCounts = array('Q', bytes(8 * 0x10000))
+        self.pcCycles = array('Q', bytes(8 * 0x10000))
+        self.z80Class = None
+
+    def install(self) -> None:
+        if self.z80Class is not None: return
+        counts, cycles, hostTime, pcCounts, pcCycles = self.counts, self.cycles, self.hostTime, self.pcCounts, self.pcCycles
+        z80Class = type(self.emu.z80)
+        clock = time.perf_counter_ns
+
+        def fetchAndExec(z80) -> int:
+            pc = z80.PC
+            start = clock()
+            cyclesPassed = z80Class.fetchAndExec(z80)
+            elapsed = clock() - start
+            opcode = z80.opcode
+            counts[opcode] += 1
+            cycles[opcode] += cyclesPassed
+            hostTime[opcode] += elapsed
+            pcCounts[pc] += 1
+            pcCycles[pc] += cyclesPassed
+            return cyclesPassed
+
+        self.z80Class = swapClass(self.emu.z80, {'fetchAndExec': fetchAndExec})
+
+    def uninstall(self) -> None:
+        if self.z80Class is None: return
+        restoreClasses((self.emu.z80, self.z80Class))
+        self.z80Class = None
+
+    def opcodes(self) -> list:
+        # (opcode, name, count, cycles, host ns) sorted by emulated cycles
+        rows = [
+            (opcode, OP_MAP[opcode][2], self.counts[opcode], self.cycles[opcode], self.hostTime[opcode])
+            for opcode in range(0x200) if self.counts[opcode]
+        ]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def hotSpots(self, count: int=20) -> list:
+        # (PC, count, cycles) of the addresses taking most cycles
+        addrs = sorted((pc for pc in range(0x10000) if self.pcCounts[pc]), key=lambda pc: -self.pcCycles[pc])
+        return [(pc, self.pcCounts[pc], self.pcCycles[pc]) for pc in addrs[:count]]
+
+    def report(self, count: int=30) -> None:
+        totalCycles = sum(self.cycles) or 1
+        totalTime = sum(self.hostTime) or 1
+        print(f'opcodes by emulated cycles ({sum(self.counts)} executed):')
+        print(f'\t{"opcode":<8}{"name":<14}{"count":>12}{"cycles":>14}{"cyc%":>7}{"host ms":>10}{"host%":>7}{"ns/op":>8}')
+        for opcode, name, n, cyc, ns in self.opcodes()[:count]:
+            print(
+                f'\t{opcode:<#8x}{name:<14}{n:>12}{cyc:>14}{cyc * 100 / totalCycles:>7.1f}'
+                f'{ns / 1e6:>10.1f}{ns * 100 / totalTime:>7.1f}{ns // n:>8}'
+            )
+        print('hot spots:')
+        for pc, n, cyc in self.hotSpots():
+            print(f'\t{pc:04X}{n:>12}{cyc:>14}{cyc * 100 / totalCycles:>7.1f}')
+
+    def save(self, path: str) -> None:
+        data = {
+            'opcodes': [
+                {'opcode': opcode, 'name': name, 'count': n, 'cycles': cyc, 'hostNs': ns}
+                for opcode, name, n, cyc, ns in self.opcodes()
+            ],
+            'pcs': [{'pc': pc, 'count': n, 'cycles': cyc} for pc, n, cyc in self.hotSpots(0x10000)]
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+class CallGraph(object):
+    # shadow call stack of the emulated program, entered by CALL, RST and interrupts and left by RET and RETI,
+    # emulated cycles are summed per stack and exported in the folded format of flamegraph tools
+
+    ROOT = 'main'
+    __slots__ = ('emu', 'symbols', 'frames', 'stack', 'haltStack', 'folded', 'z80Class')
+
+    def __init__(self, emu, symPath: str=None) -> None:
+        # reference of emulator
+        self.emu = emu
+        # (bank, addr) -> name of routine
+        self.symbols = loadSymbols(symPath) if symPath else {}
+        # SP right after entering each frame, the frame is left once a RET finds SP back there
+        self.frames = []
+        # names of the frames, the key of folded
+        self.stack = (CallGraph.ROOT,)
+        self.haltStack = self.stack + ('HALT',)
+        self.folded = {}
+        self.z80Class = None
+
+    def install(self) -> None:
+        if self.z80Class is not None: return
+        profile, folded = self, self.folded
+        z80Class = type(self.emu.z80)
+
+        def step(z80) -> int:
+            if not z80.halted or z80.intrPending:
+                return z80Class.step(z80)
+            # waiting for an interrupt
+            cyclesPassed = z80Class.step(z80)
+            folded[profile.haltStack] = folded.get(profile.haltStack, 0) + cyclesPassed
+            return cyclesPassed
+
+        def handleInterrupted(z80) -> int:
+            pc = z80.PC
+            ticks = z80Class.handleInterrupted(z80)
+            if z80.PC != pc:
+                profile.enter(z80.PC, z80.SP, INTR_NAMES.get(z80.PC))
+            folded[profile.stack] = folded.get(profile.stack, 0) + ticks
+            return ticks
+
+        def fetchAndExec(z80) -> int:
+            sp = z80.SP
+            cyclesPassed = z80Class.fetchAndExec(z80)
+            folded[profile.stack] = folded.get(profile.stack, 0) + cyclesPassed
+            opcode = z80.opcode
+            if opcode in CALL_OPS:
+                # conditional calls only count when taken
+                if z80.SP == (sp - 2) & 0xFFFF:
+                    profile.enter(z80.PC, z80.SP)
+            elif opcode in RET_OPS:
+                if z80.SP == (sp + 2) & 0xFFFF:
+                    profile.leave(sp)
+            return cyclesPassed
+
+        self.z80Class = swapClass(self.emu.z80, {
+            'step': step, 'handleInterrupted': handleInterrupted, 'fetchAndExec': fetchAndExec
+        })
+
+    def uninstall(self) -> None:
+        if self.z80Class is None: return
+        restoreClasses((self.emu.z80, self.z80Class))
+        self.z80Class = None
+
+    def name(self, addr: int) -> str:
+        bank = self.emu.mmu.mbc.hiBank if 0x4000 <= addr < 0x8000 else 0
+        name = self.symbols.get((bank, addr))
+        return name if name else f'{bank:02X}:{addr:04X}'
+
+    def enter(self, addr: int, sp: int, name: str=None) -> None:
+        self.frames.append(sp)
+        self.setStack(self.stack + (name or self.name(addr),))
+
+    def leave(self, sp: int) -> None:
+        # frames whose return address was dropped (e.g. by POP and JP) are left together,
+        # a RET below the top frame is a jump through the stack and leaves nothing
+        depth = len(self.frames)
+        while depth and self.frames[depth - 1] <= sp:
+            depth -= 1
+        if depth < len(self.frames):
+            del self.frames[depth:]
+            self.setStack(self.stack[:depth + 1])
+
+    def setStack(self, stack: tuple) -> None:
+        self.stack = stack
+        self.haltStack = stack + ('HALT',)
+
+    def report(self, count: int=20) -> None:
+        # cycles spent in each routine, with and without its callees
+        total = sum(self.folded.values()) or 1
+        own, inclusive = {}, {}
+        for stack, cycles in self.folded.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + cycles
+            for name in set(stack):
+                inclusive[name] = inclusive.get(name, 0) + cycles
+        print(f'routines by emulated cycles ({total} cycles):')
+        print(f'\t{"routine":<24}{"self":>12}{"self%":>7}{"total":>12}{"total%":>7}')
+        for name in sorted(inclusive, key=lambda name: -own.get(name, 0))[:count]:
+            print(
+                f'\t{name:<24}{own.get(name, 0):>12}{own.get(name, 0) * 100 / total:>7.1f}'
+                f'{inclusive[name]:>12}{inclusive[name] * 100 / total:>7.1f}'
+            )
+
+    def save(self, path: str) -> None:
+        # one line per stack: frames separated by ; and the cycles spent there
+        with open(path, 'w') as f:
+            for stack, cycles in sorted(self.folded.items()):
+                f.write(f'{";".join(stack)} {cycles}\n')
+
+class Sampler(object):
+    # statistical profiler of the host, a timer signal samples which subsystem is running and the emulated PC,
+    # helpers (utils, instruments) are charged to their callers
+
+    __slots__ = ('emu', 'interval', 'samples', 'subsystems', 'functions', 'pcs', 'handler')
+
+    def __init__(self, emu, interval: float=0.001) -> None:
+        assert hasattr(signal, 'setitimer'), '!!! sampling needs signal.setitimer (unix only) !!!'
+        # reference of emulator
+        self.emu = emu
+        # seconds of cpu time between samples
+        self.interval = interval
+        self.samples = 0
+        self.subsystems = {}
+        # (subsystem, module:function) -> samples
+        self.functions = {}
+        self.pcs = {}
+        self.handler = None
+
+    def start(self) -> None:
+        if self.handler is not None: return
+        self.handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        if self.handler is None: return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.handler)
+        self.handler = None
+
+    def sample(self, signum: int, frame) -> None:
+        subsystem, function = 'other', '?'
+        while frame is not None:
+            module = os.path.basename(frame.f_code.co_filename)
+            name = frame.f_code.co_name
+            if module in MODULE_SUBSYSTEMS:
+                subsystem, function = MODULE_SUBSYSTEMS[module], f'{module[:-3]}:{name}'
+                break
+            elif module == 'ppu.py':
+                subsystem, function = PPU_SUBSYSTEMS.get(name, 'ppu timing'), f'ppu:{name}'
+                break
+            frame = frame.f_back
+        self.samples += 1
+        self.subsystems[subsystem] = self.subsystems.get(subsystem, 0) + 1
+        key = (subsystem, function)
+        self.functions[key] = self.functions.get(key, 0) + 1
+        pc = self.emu.z80.PC
+        self.pcs[pc] = self.pcs.get(pc, 0) + 1
+
+    def report(self, count: int=15) -> None:
+        total = self.samples or 1
+        print(f'{self.samples} samples every {self.interval * 1000:g} ms of cpu time')
+        print('subsystems:')
+        for name, n in sorted(self.subsystems.items(), key=lambda item: -item[1]):
+            print(f'\t{name:<14}{n:>8}{n * 100 / total:>7.1f}%')
+        print('functions:')
+        for (subsystem, function), n in sorted(self.functions.items(), key=lambda item: -item[1])[:count]:
+            print(f'\t{function:<32}{subsystem:<14}{n:>8}{n * 100 / total:>7.1f}%')
+        print('emulated PC:')
+        for pc, n in sorted(self.pcs.items(), key=lambda item: -item[1])[:count]:
+            print(f'\t{pc:04X}{n:>8}{n * 100 / total:>7.1f}%')
+
+class Tracer(object):
+    # trace events of chrome://tracing and perfetto streamed to a json file, with spans of frames,
+    # rendering, presenting and DMA on the host timeline and counters of every frame
+
+    SPANS = {
+        'ppu': ('render', 'renderBackground', 'renderWindow', 'renderSprites', 'updateLCD'),
+        'mmu': ('requestDmaTransfer',)
+    }
+    __slots__ = ('emu', 'path', 'file', 'origin', 'first', 'instructions', 'frameStart', 'classes')
+
+    def __init__(self, emu, path: str) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.path = path
+        self.file = None
+        self.origin = 0
+        self.first = True
+        # instructions executed in current frame, boxed for the closures
+        self.instructions = [0]
+        self.frameStart = 0
+        # unit -> original class
+        self.classes = {}
+
+    def now(self) -> float:
+        # microseconds since install
+        return (time.perf_counter_ns() - self.origin) / 1000
+
+    def emit(self, event: dict) -> None:
+        event['pid'] = os.getpid()
+        event['tid'] = 0
+        self.file.write(('[\n' if self.first else ',\n') + json.dumps(event))
+        self.first = False
+
+    def span(self, name: str, start: float, end: float, args: dict=None) -> None:
+        event = {'name': name, 'ph': 'X', 'ts': start, 'dur': end - start}
+        if args:
+            event['args'] = args
+        self.emit(event)
+
+    def install(self) -> None:
+        if self.file is not None: return
+        self.file = open(self.path, 'w')
+        self.origin = time.perf_counter_ns()
+        self.first = True
+        self.emit({'name': 'process_name', 'ph': 'M', 'args': {'name': f'pyGB {self.emu.rom}'}})
+        tracer, instructions = self, self.instructions
+        units = {'z80': self.emu.z80, 'ppu': self.emu.ppu, 'mmu': self.emu.mmu}
+        classes = {name: type(unit) for name, unit in units.items()}
+
+        def timed(unitClass: type, name: str):
+            method = getattr(unitClass, name)
+
+            def wrapper(unit, *args):
+                start = tracer.now()
+                result = method(unit, *args)
+                tracer.span(name, start, tracer.now())
+                return result
+            return wrapper
+
+        def renderBackground(ppu, *args) -> None:
+            start = tracer.now()
+            classes['ppu'].renderBackground(ppu, *args)
+            tracer.span('renderBackground', start, tracer.now(), {'tiles': ppu.redrawn})
+
+        def fire(ppu, t: int) -> None:
+            frames = ppu.emu.frames
+            classes['ppu'].fire(ppu, t)
+            if ppu.emu.frames != frames:
+                tracer.endFrame()
+
+        def fetchAndExec(z80) -> int:
+            # idle steps while halted execute nothing
+            instructions[0] += 1
+            return classes['z80'].fetchAndExec(z80)
+
+        methods = {unit: {name: timed(classes[unit], name) for name in names} for unit, names in Tracer.SPANS.items()}
+        methods['ppu'].update(renderBackground=renderBackground, fire=fire)
+        methods['z80'] = {'fetchAndExec': fetchAndExec}
+        for name, unit in units.items():
+            self.classes[name] = swapClass(unit, methods[name])
+        self.instructions[0] = 0
+        self.frameStart = self.now()
+
+    def endFrame(self) -> None:
+        end = self.now()
+        self.span('frame', self.frameStart, end, {'frame': self.emu.frames})
+        self.emit({'name': 'instructions', 'ph': 'C', 'ts': end, 'args': {'instructions': self.instructions[0]}})
+        self.instructions[0] = 0
+        self.frameStart = end
+
+    def uninstall(self) -> None:
+        if self.file is None: return
+        restoreClasses(*((getattr(self.emu, name), unitClass) for name, unitClass in self.classes.items()))
+        self.classes = {}
+        self.file.write('\n]\n' if not self.first else '[]\n')
+        self.file.close()
+        self.file = None
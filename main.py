@@ -1,8 +1,10 @@
+import sys
 from emulator import Emulator
 
 # ROM = './test_rom/cpu_instr/08.gb'
 ROM = './test_rom/games/Tetris.gb'
-emu = Emulator(ROM, skipBios=False, nostalgic=False)
+# --threaded presents frames from a thread, the SDL video backend must allow it (e.g. x11, not cocoa)
+emu = Emulator(ROM, skipBios=False, nostalgic=False, speed=1.0, threaded='--threaded' in sys.argv[1:])
 try:
     emu.run()
 except Exception as e:
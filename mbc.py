@@ -0,0 +1,342 @@
+# memory bank controllers
+# the ROM file is mapped read-only, switching a bank only re-points a memoryview window
+import mmap, os
+from cartridge import Header
+from utils import toHex
+# sizes of banks
+ROM_BANK_SIZE = 0x4000
+RAM_BANK_SIZE = 0x2000
+# cartridge RAM is tracked in pages of 256 bytes, which are flushed to the save file when dirty
+PAGE_SIZE = 0x100
+# MBC3 clock, its state is kept right after RAM in the save file
+CLOCK_RATE = 4194304
+SECONDS_PER_DAY = 86400
+RTC_SIZE = 0x10
+
+class MBC(object):
+    # cartridge without controller (32KB ROM, optional 8KB RAM)
+
+    # registers kept by snapshots, the windows are rebuilt from them
+    STATE = ('ramEnabled',)
+    __slots__ = (
+        'emu', 'rom', 'ram', 'romBanks', 'ramBanks',
+        'romLo', 'romHi', 'hiBank', 'ramView', 'ramBase', 'ramMask', 'ramEnabled',
+        'header', 'save', 'dirty'
+    )
+
+    def __init__(self, emu, rom: mmap.mmap, ram, save: mmap.mmap=None) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.header = Header(rom)
+        # ram is a bytearray, or a view of the save file mapped by save for battery backed cartridges
+        self.rom = memoryview(rom)
+        self.ram = memoryview(ram)
+        self.romBanks = max(len(rom) // ROM_BANK_SIZE, 2)
+        self.ramBanks = max(len(ram) // RAM_BANK_SIZE, 1)
+        # windows of 0x0000 ~ 0x3FFF, 0x4000 ~ 0x7FFF and 0xA000 ~ 0xBFFF
+        self.romLo = self.romHi = self.ramView = None
+        # bank mapped to 0x4000 ~ 0x7FFF
+        self.hiBank = 1
+        self.ramBase = 0
+        self.ramMask = min(len(ram), RAM_BANK_SIZE) - 1
+        self.ramEnabled = False
+        # save file
+        self.save = save
+        self.dirty = bytearray(-(-len(ram if save is None else save) // PAGE_SIZE))
+        self.remap()
+
+    def snapshot(self) -> tuple:
+        return bytes(self.ram), tuple(getattr(self, name) for name in self.STATE)
+
+    def restore(self, state: tuple) -> None:
+        ram, values = state
+        self.ram[:] = ram
+        for name, value in zip(self.STATE, values):
+            setattr(self, name, value)
+        if self.save is not None:
+            self.dirty[:] = b'\x01' * len(self.dirty)
+        self.remap()
+
+    def mapRom(self, loBank: int, hiBank: int) -> None:
+        loBank %= self.romBanks
+        hiBank %= self.romBanks
+        self.hiBank = hiBank
+        self.romLo = self.rom[loBank * ROM_BANK_SIZE:(loBank + 1) * ROM_BANK_SIZE]
+        self.romHi = self.rom[hiBank * ROM_BANK_SIZE:(hiBank + 1) * ROM_BANK_SIZE]
+
+    def mapRam(self, bank: int) -> None:
+        bank %= self.ramBanks
+        self.ramBase = bank * RAM_BANK_SIZE
+        self.ramView = self.ram[self.ramBase:self.ramBase + RAM_BANK_SIZE]
+
+    def remap(self) -> None:
+        self.mapRom(0, 1)
+        self.mapRam(0)
+
+    def enableRam(self, byte: int) -> None:
+        enabled = (byte & 0x0F) == 0x0A and len(self.ram) > 0
+        if self.ramEnabled and not enabled:
+            # games disable RAM once they are done with saving
+            self.flush()
+        self.ramEnabled = enabled
+
+    def flush(self) -> None:
+        if self.save is None: return
+        # msync works on whole pages of the system, flush the blocks holding dirty pages
+        pagesPerBlock = mmap.ALLOCATIONGRANULARITY // PAGE_SIZE
+        page = self.dirty.find(1)
+        while page >= 0:
+            first = page - page % pagesPerBlock
+            last = min(first + pagesPerBlock, len(self.dirty))
+            self.save.flush(first * PAGE_SIZE, min(last * PAGE_SIZE, len(self.save)) - first * PAGE_SIZE)
+            self.dirty[first:last] = bytes(last - first)
+            page = self.dirty.find(1, last)
+
+    def close(self) -> None:
+        # called when the emulator quits
+        self.flush()
+
+    def write(self, addr: int, byte: int) -> None:
+        # ROM is read only
+        pass
+
+    def readRam(self, offset: int) -> int:
+        if self.ramEnabled:
+            return self.ramView[offset & self.ramMask]
+        return 0xFF
+
+    def writeRam(self, offset: int, byte: int) -> None:
+        if self.ramEnabled:
+            offset &= self.ramMask
+            self.ramView[offset] = byte
+            self.dirty[(self.ramBase + offset) // PAGE_SIZE] = 1
+
+class MBC1(MBC):
+
+    STATE = MBC.STATE + ('bank1', 'bank2', 'mode')
+    __slots__ = ('bank1', 'bank2', 'mode')
+
+    def __init__(self, emu, rom: mmap.mmap, ram, save: mmap.mmap=None) -> None:
+        self.bank1 = 1
+        self.bank2 = 0
+        self.mode = 0
+        super().__init__(emu, rom, ram, save)
+
+    def remap(self) -> None:
+        # mode 1 lets the upper bits select the first ROM bank and the RAM bank too
+        upper = self.bank2 << 5
+        self.mapRom(upper if self.mode else 0, upper | self.bank1)
+        self.mapRam(self.bank2 if self.mode else 0)
+
+    def write(self, addr: int, byte: int) -> None:
+        if addr < 0x2000:
+            self.enableRam(byte)
+            return
+        elif addr < 0x4000:
+            self.bank1 = (byte & 0x1F) or 1
+        elif addr < 0x6000:
+            self.bank2 = byte & 0x03
+        else:
+            self.mode = byte & 0x01
+        self.remap()
+
+class MBC3(MBC):
+
+    STATE = MBC.STATE + ('romBank', 'ramBank', 'rtcBase', 'rtcStamp', 'rtcHalted', 'rtcCarry', 'latchPrimed')
+    __slots__ = (
+        'romBank', 'ramBank',
+        'rtcBase', 'rtcStamp', 'rtcHalted', 'rtcCarry', 'rtcSave', 'rtcSaved', 'latched', 'latchPrimed'
+    )
+
+    def __init__(self, emu, rom: mmap.mmap, ram, save: mmap.mmap=None) -> None:
+        self.romBank = 1
+        self.ramBank = 0
+        super().__init__(emu, rom, ram, save)
+        # the clock only follows emulated time: it counts rtcBase cycles at rtcStamp
+        # and is only computed when latched or written, never ticked
+        self.rtcBase = 0
+        self.rtcStamp = 0
+        self.rtcHalted = False
+        self.rtcCarry = False
+        # S, M, H, DL, DH
+        self.latched = bytearray(5)
+        self.latchPrimed = False
+        self.rtcSave = None
+        if save is not None and len(save) >= len(ram) + RTC_SIZE:
+            self.rtcSave = memoryview(save)[len(ram):len(ram) + RTC_SIZE]
+            self.rtcBase = int.from_bytes(self.rtcSave[0:8], 'little')
+            self.rtcHalted = bool(self.rtcSave[8] & 0x01)
+            self.rtcCarry = bool(self.rtcSave[8] & 0x02)
+        # clock state as last written to the save file
+        self.rtcSaved = (self.rtcBase, self.rtcStamp, self.rtcHalted, self.rtcCarry)
+
+    def snapshot(self) -> tuple:
+        return super().snapshot(), bytes(self.latched)
+
+    def restore(self, state: tuple) -> None:
+        state, latched = state
+        super().restore(state)
+        self.latched[:] = latched
+
+    def remap(self) -> None:
+        # clock registers leave the RAM window as it was
+        self.mapRom(0, self.romBank)
+        if self.ramBank < 0x04:
+            self.mapRam(self.ramBank)
+
+    def write(self, addr: int, byte: int) -> None:
+        if addr < 0x2000:
+            self.enableRam(byte)
+        elif addr < 0x4000:
+            self.romBank = (byte & 0x7F) or 1
+            self.mapRom(0, self.romBank)
+        elif addr < 0x6000:
+            # 0x08 ~ 0x0C select the clock registers
+            self.ramBank = byte & 0x0F
+            if self.ramBank < 0x04:
+                self.mapRam(self.ramBank)
+        else:
+            # writing 0x00 then 0x01 latches the clock
+            if byte == 0x01 and self.latchPrimed:
+                self.latch()
+            self.latchPrimed = byte == 0x00
+
+    def readRam(self, offset: int) -> int:
+        if self.ramBank < 0x04:
+            return super().readRam(offset) if len(self.ram) else 0xFF
+        elif self.ramEnabled and 0x08 <= self.ramBank <= 0x0C:
+            return self.latched[self.ramBank - 0x08]
+        # nothing is mapped to 0x04 ~ 0x07 and 0x0D ~ 0x0F
+        return 0xFF
+
+    def writeRam(self, offset: int, byte: int) -> None:
+        if self.ramBank < 0x04:
+            if len(self.ram):
+                super().writeRam(offset, byte)
+        elif self.ramEnabled and 0x08 <= self.ramBank <= 0x0C:
+            self.writeRtc(self.ramBank, byte)
+
+    def enableRam(self, byte: int) -> None:
+        # the clock is usable without cartridge RAM
+        enabled = (byte & 0x0F) == 0x0A
+        if self.ramEnabled and not enabled:
+            self.flush()
+        self.ramEnabled = enabled
+
+    def rtcNow(self) -> int:
+        if self.rtcHalted:
+            return self.rtcBase
+        return self.rtcBase + self.emu.cycles - self.rtcStamp
+
+    def setRtc(self, total: int) -> None:
+        self.rtcBase = total
+        self.rtcStamp = self.emu.cycles
+
+    def latch(self) -> None:
+        total = self.rtcNow()
+        secs = total // CLOCK_RATE
+        days = secs // SECONDS_PER_DAY
+        if days >= 0x200:
+            # the day counter overflows, its carry stays set until the game clears it
+            self.rtcCarry = True
+            self.setRtc(total - (days - days % 0x200) * SECONDS_PER_DAY * CLOCK_RATE)
+            days %= 0x200
+        self.latched[0] = secs % 60
+        self.latched[1] = secs // 60 % 60
+        self.latched[2] = secs // 3600 % 24
+        self.latched[3] = days & 0xFF
+        self.latched[4] = (days >> 8) | (self.rtcHalted << 6) | (self.rtcCarry << 7)
+
+    def writeRtc(self, reg: int, byte: int) -> None:
+        secs, sub = divmod(self.rtcNow(), CLOCK_RATE)
+        s, m, h, d = secs % 60, secs // 60 % 60, secs // 3600 % 24, secs // SECONDS_PER_DAY % 0x200
+        if reg == 0x08:
+            # writing seconds also resets the sub-second counter
+            s, sub = byte & 0x3F, 0
+        elif reg == 0x09:
+            m = byte & 0x3F
+        elif reg == 0x0A:
+            h = byte & 0x1F
+        elif reg == 0x0B:
+            d = (d & 0x100) | byte
+        else:
+            d = (d & 0xFF) | ((byte & 0x01) << 8)
+            self.rtcHalted = bool(byte & 0x40)
+            self.rtcCarry = bool(byte & 0x80)
+        self.setRtc((((d * 24 + h) * 60 + m) * 60 + s) * CLOCK_RATE + sub)
+
+    def flush(self) -> None:
+        # the clock page is only written when the game changed the clock
+        if self.rtcSave is not None and (self.rtcBase, self.rtcStamp, self.rtcHalted, self.rtcCarry) != self.rtcSaved:
+            self.saveRtc()
+        super().flush()
+
+    def close(self) -> None:
+        # a running clock moves on without changing its state, its count is saved when leaving
+        if self.rtcSave is not None:
+            self.saveRtc()
+        super().close()
+
+    def saveRtc(self) -> None:
+        self.rtcSave[0:8] = self.rtcNow().to_bytes(8, 'little')
+        self.rtcSave[8] = self.rtcHalted | (self.rtcCarry << 1)
+        self.dirty[len(self.ram) // PAGE_SIZE] = 1
+        self.rtcSaved = (self.rtcBase, self.rtcStamp, self.rtcHalted, self.rtcCarry)
+
+class MBC5(MBC):
+
+    STATE = MBC.STATE + ('romBank', 'ramBank')
+    __slots__ = ('romBank', 'ramBank')
+
+    def __init__(self, emu, rom: mmap.mmap, ram, save: mmap.mmap=None) -> None:
+        self.romBank = 1
+        self.ramBank = 0
+        super().__init__(emu, rom, ram, save)
+
+    def remap(self) -> None:
+        self.mapRom(0, self.romBank)
+        self.mapRam(self.ramBank)
+
+    def write(self, addr: int, byte: int) -> None:
+        if addr < 0x2000:
+            self.enableRam(byte)
+        elif addr < 0x3000:
+            # bank 0 can be mapped to 0x4000 ~ 0x7FFF as well
+            self.romBank = (self.romBank & 0x100) | byte
+            self.mapRom(0, self.romBank)
+        elif addr < 0x4000:
+            self.romBank = ((byte & 0x01) << 8) | (self.romBank & 0xFF)
+            self.mapRom(0, self.romBank)
+        elif addr < 0x6000:
+            self.ramBank = byte & 0x0F
+            self.mapRam(self.ramBank)
+
+# controller named by the cartridge header
+MBC_TYPES = {'ROM': MBC, 'MBC1': MBC1, 'MBC3': MBC3, 'MBC5': MBC5}
+
+def loadCartridge(emu, path: str, savePath: str=None) -> MBC:
+    # savePath defaults to the .sav next to the ROM, an empty string keeps RAM in memory
+    with open(path, 'rb') as f:
+        # the mapping stays valid after the file is closed
+        rom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header = Header(rom)
+    assert header.mbc in MBC_TYPES, f'!!! unsupported cartridge type {toHex(header.cartType)} !!!'
+    if not header.valid:
+        print(f'*** {path} has an invalid header ***')
+
+    saveSize = header.ramSize + (RTC_SIZE if header.rtc else 0)
+    if savePath is None:
+        savePath = os.path.splitext(path)[0] + '.sav'
+    if header.battery and saveSize and savePath:
+        save = openSave(savePath, saveSize)
+        return MBC_TYPES[header.mbc](emu, rom, memoryview(save)[:header.ramSize], save)
+    return MBC_TYPES[header.mbc](emu, rom, bytearray(header.ramSize))
+
+def openSave(path: str, size: int) -> mmap.mmap:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        return mmap.mmap(fd, size)
+    finally:
+        os.close(fd)
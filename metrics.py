@@ -0,0 +1,181 @@
+# live metrics in the text format of prometheus
+# counters are plain numbers written by the emulation thread and only read by the http thread, nothing is locked
+import os, resource, threading, time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from instrument import swapClass, restoreClasses
+from mbc import CLOCK_RATE
+from ppu import LCDC_ADDR
+
+class Counters(object):
+    # counters of one emulator, gathered by instrumented subclasses of its units
+
+    # indices of values
+    INSTRUCTIONS, RENDERS, RENDER_NS, LAST_RENDER_NS, TILE_HITS, TILE_MISSES = range(6)
+    __slots__ = ('emu', 'name', 'values', 'started', 'lastScrape', 'classes')
+
+    def __init__(self, emu, name: str) -> None:
+        # reference of emulator
+        self.emu = emu
+        self.name = name
+        self.values = array('Q', bytes(8 * 6))
+        self.started = time.monotonic()
+        # (time, instructions, cycles) of previous scrape, for rates over the scrape interval
+        self.lastScrape = (self.started, 0, emu.cycles)
+        self.classes = {}
+
+    def install(self) -> None:
+        if self.classes: return
+        values, clock = self.values, time.perf_counter_ns
+        z80Class, ppuClass = type(self.emu.z80), type(self.emu.ppu)
+
+        def fetchAndExec(z80) -> int:
+            # idle steps while halted execute nothing
+            values[Counters.INSTRUCTIONS] += 1
+            return z80Class.fetchAndExec(z80)
+
+        def render(ppu) -> None:
+            start = clock()
+            ppuClass.render(ppu)
+            elapsed = clock() - start
+            values[Counters.RENDERS] += 1
+            values[Counters.RENDER_NS] += elapsed
+            values[Counters.LAST_RENDER_NS] = elapsed
+
+        def renderBackground(ppu, *args) -> None:
+            # every tile drawn again is a miss, remapped or written in place
+            ppuClass.renderBackground(ppu, *args)
+            if ppu.emu.mmu.bytes[LCDC_ADDR] & 0x01:
+                values[Counters.TILE_MISSES] += ppu.redrawn
+                values[Counters.TILE_HITS] += len(ppu.cache) - ppu.redrawn
+
+        self.classes['z80'] = swapClass(self.emu.z80, {'fetchAndExec': fetchAndExec})
+        self.classes['ppu'] = swapClass(self.emu.ppu, {'render': render, 'renderBackground': renderBackground})
+
+    def uninstall(self) -> None:
+        restoreClasses(*((getattr(self.emu, name), unitClass) for name, unitClass in self.classes.items()))
+        self.classes = {}
+
+    def samples(self) -> list:
+        # (metric, value) read without stopping the emulator, values may be a few instructions apart
+        now = time.monotonic()
+        values = self.values
+        instructions, cycles = values[Counters.INSTRUCTIONS], self.emu.cycles
+        lastTime, lastInstructions, lastCycles = self.lastScrape
+        self.lastScrape = (now, instructions, cycles)
+        interval = max(now - lastTime, 1e-9)
+        renders = values[Counters.RENDERS]
+        tiles = values[Counters.TILE_HITS] + values[Counters.TILE_MISSES]
+        return [
+            ('pygb_frames_total', self.emu.frames),
+            ('pygb_instructions_total', instructions),
+            ('pygb_instructions_per_second', (instructions - lastInstructions) / interval),
+            ('pygb_emulated_seconds_total', cycles / CLOCK_RATE),
+            ('pygb_real_seconds_total', now - self.started),
+            # 1.0 is real time, computed over the last scrape interval
+            ('pygb_speed_ratio', (cycles - lastCycles) / CLOCK_RATE / interval),
+            ('pygb_render_seconds_total', values[Counters.RENDER_NS] / 1e9),
+            ('pygb_render_seconds_last', values[Counters.LAST_RENDER_NS] / 1e9),
+            ('pygb_render_seconds_mean', values[Counters.RENDER_NS] / 1e9 / renders if renders else 0.0),
+            ('pygb_tile_cache_hits_total', values[Counters.TILE_HITS]),
+            ('pygb_tile_cache_misses_total', values[Counters.TILE_MISSES]),
+            ('pygb_tile_cache_hit_ratio', values[Counters.TILE_HITS] / tiles if tiles else 0.0),
+            ('pygb_buffer_bytes', self.buffers()),
+            ('pygb_pacing_lag_seconds', self.emu.governor.lag if self.emu.governor is not None else 0.0),
+        ]
+
+    def buffers(self) -> int:
+        # size of the buffers owned by the instance, fixed once it is made, the mapped ROM is shared and left out
+        ppu = self.emu.ppu
+        return len(self.emu.mmu.bytes) + len(self.emu.mmu.mbc.ram) + len(ppu.cache) + len(ppu.buffer) + len(ppu.bgIndex) + len(ppu.frame)
+
+def residentBytes() -> int:
+    # pages resident now (2nd field of statm), None where /proc is missing
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return None
+
+class MetricsServer(object):
+    # http endpoint serving /metrics from a daemon thread
+
+    HELP = {
+        'pygb_frames_total': ('counter', 'frames emulated'),
+        'pygb_instructions_total': ('counter', 'instructions executed'),
+        'pygb_instructions_per_second': ('gauge', 'instructions per second since the previous scrape'),
+        'pygb_emulated_seconds_total': ('counter', 'emulated time'),
+        'pygb_real_seconds_total': ('counter', 'wall time since metrics were installed'),
+        'pygb_speed_ratio': ('gauge', 'emulated time over real time since the previous scrape'),
+        'pygb_render_seconds_total': ('counter', 'host time spent in PPU.render'),
+        'pygb_render_seconds_last': ('gauge', 'host time of the last PPU.render'),
+        'pygb_render_seconds_mean': ('gauge', 'mean host time of PPU.render'),
+        'pygb_tile_cache_hits_total': ('counter', 'background tiles found in the tile cache'),
+        'pygb_tile_cache_misses_total': ('counter', 'background tiles drawn again'),
+        'pygb_tile_cache_hit_ratio': ('gauge', 'share of background tiles found in the tile cache'),
+        'pygb_buffer_bytes': ('gauge', 'fixed size of memory, cartridge RAM and screen buffers of the instance'),
+        'pygb_pacing_lag_seconds': ('gauge', 'seconds behind the paced schedule, negative when ahead'),
+    }
+    __slots__ = ('counters', 'httpd', 'thread')
+
+    def __init__(self, host: str='127.0.0.1', port: int=9464) -> None:
+        self.counters = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = server.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics', daemon=True)
+        self.thread.start()
+
+    def watch(self, emu, name: str=None) -> Counters:
+        counters = Counters(emu, name or f'{os.path.basename(emu.rom)}#{len(self.counters)}')
+        counters.install()
+        self.counters.append(counters)
+        return counters
+
+    def unwatch(self, emu) -> None:
+        for counters in [counters for counters in self.counters if counters.emu is emu]:
+            counters.uninstall()
+            self.counters.remove(counters)
+
+    def render(self) -> str:
+        samples = {}
+        for counters in list(self.counters):
+            for metric, value in counters.samples():
+                samples.setdefault(metric, []).append((counters.name, value))
+        lines = []
+        for metric, series in samples.items():
+            kind, text = MetricsServer.HELP[metric]
+            lines.append(f'# HELP {metric} {text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for name, value in series:
+                lines.append(f'{metric}{{instance="{name}"}} {value}')
+        # current resident memory of the whole process, which is where growth of instances shows
+        resident = residentBytes()
+        if resident is not None:
+            lines.append('# HELP pygb_process_resident_bytes resident memory of the process')
+            lines.append('# TYPE pygb_process_resident_bytes gauge')
+            lines.append(f'pygb_process_resident_bytes {resident}')
+        return '\n'.join(lines) + '\n'
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for counters in self.counters:
+            counters.uninstall()
+        self.counters = []
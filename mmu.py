@@ -14,39 +14,95 @@
 # FF80  FFFE    internal RAM
 # FFFF  FFFF    Interrupts Enable Register (IE)
 
-from utils import toHex
+from z80 import IF_ADDR, IE_ADDR
+from timer import DIV_ADDR, TIMA_ADDR, TAC_ADDR
+from ppu import LCDC_ADDR, STAT_ADDR, LY_ADDR, LYC_ADDR, PPU
+from mbc import loadCartridge
+from cartridge import LOGO_ADDR, LOGO
+from utils import toHex, NEVER
+import os
 # addresses of registers
 P1_ADDR   = 0xFF00
 DMA_ADDR  = 0xFF46
 BOOT_ADDR = 0xFF50
+# 160 bytes at 4 cycles each
+DMA_TIME  = 640
+# boot rom of DMG, looked up next to the sources
+BIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bios.gb')
+BIOS_SIZE = 0x100
+# I/O registers (0xFF00 ~ 0xFF7F) when the boot rom hands over to the cartridge, unlisted ones read 0xFF
+POST_BOOT_IO = bytearray((0xFF,) * 0x80)
+for offset, byte in {
+    0x00: 0xCF, 0x01: 0x00, 0x02: 0x7E, 0x05: 0x00, 0x06: 0x00, 0x07: 0xF8, 0x0F: 0xE1,
+    0x10: 0x80, 0x11: 0xBF, 0x12: 0xF3, 0x13: 0xFF, 0x14: 0xBF, 0x16: 0x3F, 0x17: 0x00,
+    0x18: 0xFF, 0x19: 0xBF, 0x1A: 0x7F, 0x1B: 0xFF, 0x1C: 0x9F, 0x1D: 0xFF, 0x1E: 0xBF,
+    0x20: 0xFF, 0x21: 0x00, 0x22: 0x00, 0x23: 0xBF, 0x24: 0x77, 0x25: 0xF3, 0x26: 0xF1,
+    0x40: 0x91, 0x41: 0x80, 0x42: 0x00, 0x43: 0x00, 0x44: 0x00, 0x45: 0x00, 0x46: 0xFF,
+    0x47: 0xFC, 0x4A: 0x00, 0x4B: 0x00, 0x50: 0x01
+}.items():
+    POST_BOOT_IO[offset] = byte
+# ® drawn by the boot rom after the logo
+REGISTERED = bytes((0x3C, 0x42, 0xB9, 0xA5, 0xB9, 0xA5, 0x42, 0x3C))
 
 class MMU(object):
 
     __slots__ = (
-        'emu', 'bytes', 'rom',
-        'dmaInProgress', 'dmaSetDelay', 'dmaCounter'
+        'emu', 'bytes', 'mbc',
+        'dmaInProgress', 'dmaEnd', 'flushAt', 'flushInterval', 'nextEvent'
     )
     
-    def __init__(self, emu, rom: str) -> None:
+    def __init__(self, emu, rom: str, savePath: str=None, saveInterval: int=60, bios: bytes=None) -> None:
         # reference of emulator
         self.emu = emu
         # memory
         self.bytes = bytearray(0x10000)
-        bios = bytearray(open('./bios.gb', 'rb').read())
-        for addr in range(0x100):
-            self.bytes[addr] = bios[addr]
-        self.rom = bytearray(open(rom, 'rb').read())
-        for addr in range(0x100, 0x8000):
-            self.bytes[addr] = self.rom[addr]
-        # DMA transfer
+        # cartridge ROM and RAM are served by the memory bank controller
+        self.mbc = loadCartridge(emu, rom, savePath)
+        # bios overlays the first 256 bytes of ROM until it is turned off
+        if bios is not None:
+            self.mbc.romLo = memoryview(bios + self.mbc.romLo[BIOS_SIZE:].tobytes())
+        # events of mmu: end of DMA transfer and flush of dirty save RAM every saveInterval frames
         self.dmaInProgress = False
-        self.dmaSetDelay = False
-        self.dmaCounter = 0
+        self.dmaEnd = NEVER
+        self.flushInterval = saveInterval * PPU.FRAME_TIME if saveInterval and self.mbc.save else NEVER
+        self.flushAt = self.flushInterval
+        self.nextEvent = min(self.dmaEnd, self.flushAt)
+    
+    def snapshot(self) -> tuple:
+        # the boot rom overlay is immutable and can be shared between emulators
+        bootLo = None if self.bytes[BOOT_ADDR] else self.mbc.romLo
+        return bytes(self.bytes), self.mbc.snapshot(), bootLo, self.dmaInProgress, self.dmaEnd, self.flushAt, self.nextEvent
+
+    def restore(self, state: tuple) -> None:
+        mem, mbc, bootLo, self.dmaInProgress, self.dmaEnd, self.flushAt, self.nextEvent = state
+        self.bytes[:] = mem
+        self.mbc.restore(mbc)
+        if bootLo is not None:
+            self.mbc.romLo = bootLo
     
     def read(self, addr: int) -> int:
         assert addr < 0x10000, f'!!! invalid address {toHex(addr, length=4)} !!!'
 
-        if 0xE000 <= addr < 0xFE00:
+        if addr >= 0xFF00:
+            # timer and lcd registers are updated lazily
+            if addr == DIV_ADDR:
+                return self.emu.timer.readDIV()
+            elif addr == TIMA_ADDR:
+                self.emu.timer.sync()
+            elif addr == LY_ADDR or addr == STAT_ADDR:
+                self.emu.ppu.sync()
+        elif self.dmaInProgress:
+            # cpu only reaches HRAM and registers during DMA
+            return 0xFF
+        elif addr < 0x8000:
+            # cartridge ROM
+            if addr < 0x4000:
+                return self.mbc.romLo[addr]
+            return self.mbc.romHi[addr - 0x4000]
+        elif 0xA000 <= addr < 0xC000:
+            # cartridge RAM
+            return self.mbc.readRam(addr - 0xA000)
+        elif 0xE000 <= addr < 0xFE00:
             # echo of internal RAM (≈8KB)
             return self.read(addr - 0x2000)
         
@@ -56,46 +112,121 @@ class MMU(object):
         assert addr < 0x10000, f'!!! invalid address {toHex(addr, length=4)} !!!'
         # assert addr > 0xFF, f'!!! unable to write {byte} to addr {toHex(addr, length=4)} !!!'
 
-        if 0xE000 <= addr < 0xFE00:
+        if self.dmaInProgress and addr < 0xFF00:
+            # cpu only reaches HRAM and registers during DMA
+            return
+        elif addr < 0x8000:
+            # registers of memory bank controller
+            self.mbc.write(addr, byte)
+            return
+        elif addr < 0x9800:
+            # tile data, the background is drawn again where it is used
+            self.emu.ppu.tileDirty[(addr - 0x8000) >> 4] = 1
+        elif 0xA000 <= addr < 0xC000:
+            # cartridge RAM
+            self.mbc.writeRam(addr - 0xA000, byte)
+            return
+        elif 0xE000 <= addr < 0xFE00:
             # echo of internal RAM (≈8KB)
             self.write(addr - 0x2000, byte)
+        elif 0xFE00 <= addr < 0xFEA0:
+            # sprite attributes, decoded again when drawn
+            self.emu.ppu.sprites[(addr - 0xFE00) >> 2] = None
         elif addr == P1_ADDR:
             # buttons
             byte = self.emu.ppu.pullButton(byte)
         elif addr == DMA_ADDR:
             # DMA
-            self.requestDmaTransfer()
+            self.requestDmaTransfer(byte)
             # print(f'from {toHex(byte)}00 to FE00 (DMA)')
         elif addr == BOOT_ADDR:
             # boot off
             self.remap2rom(byte)
+        elif addr == IF_ADDR or addr == IE_ADDR:
+            # interrupts
+            self.bytes[addr] = byte
+            self.emu.z80.updateInterrupt()
+            return
+        elif DIV_ADDR <= addr <= TAC_ADDR:
+            # timer
+            self.emu.timer.write(addr, byte)
+            return
+        elif addr == LCDC_ADDR or addr == STAT_ADDR or addr == LY_ADDR or addr == LYC_ADDR:
+            # lcd control, status and line registers
+            self.emu.ppu.write(addr, byte)
+            return
         
         self.bytes[addr] = byte
     
-    def requestDmaTransfer(self) -> None:
+    def requestDmaTransfer(self, byte: int) -> None:
+        # the whole OAM is copied at once, the bus stays blocked as long as the real transfer
+        self.bytes[0xFE00:0xFEA0] = self.readBlock(byte << 8, 0xA0)
+        self.emu.ppu.sprites[:] = [None] * 40
         self.dmaInProgress = True
-        self.dmaSetDelay = True
-        self.dmaCounter = 0
+        self.dmaEnd = self.emu.cycles + DMA_TIME
+        self.reschedule()
     
-    #   ld (0x46), a ; start dma transfer
-    #   ld a, 0x28   ; set counter and delay 8 cycles
-    # wait:
-    #   dec a        ; 1 cycles
-    #   jr nz, wait  ; 4 cycles
-    def step(self) -> int:
-        if self.dmaSetDelay:
-            self.dmaSetDelay = False
-            return 8
-        else:
-            src = (self.read(DMA_ADDR) << 8) + self.dmaCounter
-            dst = 0xFE00 + self.dmaCounter
-            self.write(dst, self.read(src))
-            self.dmaCounter += 1
-            if self.dmaCounter == 0xA0:
-                self.dmaInProgress = False
-            return 20
+    def sync(self) -> None:
+        if self.emu.cycles >= self.dmaEnd:
+            self.dmaInProgress = False
+            self.dmaEnd = NEVER
+        if self.emu.cycles >= self.flushAt:
+            self.mbc.flush()
+            self.flushAt = self.emu.cycles + self.flushInterval
+        self.reschedule()
+    
+    def reschedule(self) -> None:
+        self.nextEvent = min(self.dmaEnd, self.flushAt)
+        self.emu.schedule()
+
+    def readBlock(self, addr: int, length: int) -> bytes:
+        # the block must not cross the border of a memory region
+        if addr < 0x4000:
+            return self.mbc.romLo[addr:addr + length]
+        elif addr < 0x8000:
+            return self.mbc.romHi[addr - 0x4000:addr - 0x4000 + length]
+        elif 0xA000 <= addr < 0xC000:
+            return bytes(self.mbc.readRam(addr - 0xA000 + offset) for offset in range(length))
+        elif 0xE000 <= addr < 0xFE00:
+            # echo of internal RAM (≈8KB)
+            addr -= 0x2000
+        return self.bytes[addr:addr + length]
+
+    def loadPostBoot(self) -> None:
+        # the state left by the boot rom, written in bulk instead of running it
+        mem = self.bytes
+        mem[0xFF00:0xFF80] = POST_BOOT_IO
+        mem[0xFFFF] = 0x00
+        # the logo of the header is scaled up to tiles 0x01 ~ 0x18, followed by ® as tile 0x19
+        mem[0x8010:0x8190] = decodeLogo(self.mbc.rom[LOGO_ADDR:LOGO_ADDR + len(LOGO)])
+        mem[0x8190:0x81A0:2] = REGISTERED
+        mem[0x9904:0x9910] = bytes(range(0x01, 0x0D))
+        mem[0x9910] = 0x19
+        mem[0x9924:0x9930] = bytes(range(0x0D, 0x19))
+        self.emu.ppu.tileDirty[:] = b'\x01' * len(self.emu.ppu.tileDirty)
 
     def remap2rom(self, byte: int) -> None:
         if self.bytes[BOOT_ADDR] ^ byte:
-            for addr in range(0x100):
-                self.bytes[addr] = self.rom[addr]
+            self.mbc.remap()
+
+def loadBios(path: str=BIOS_PATH) -> bytes:
+    # None unless a complete boot rom is found
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        bios = f.read()
+    if len(bios) != BIOS_SIZE:
+        print(f'*** {path} is not a boot rom of {BIOS_SIZE} bytes, booting without it ***')
+        return None
+    return bios
+
+def decodeLogo(logo: bytes) -> bytearray:
+    # every bit is doubled, a nibble gives 2 rows of a tile written to every other byte
+    tiles = bytearray(len(logo) * 8)
+    for idx, byte in enumerate(logo):
+        for half, nibble in enumerate((byte >> 4, byte & 0x0F)):
+            row = 0
+            for bit in range(3, -1, -1):
+                row = (row << 2) | (0x03 if nibble >> bit & 1 else 0x00)
+            tiles[idx * 8 + half * 4] = tiles[idx * 8 + half * 4 + 2] = row
+    return tiles
@@ -0,0 +1,60 @@
+# pool of warm emulators
+# booting and playing up to a given frame is done once per ROM, later instances are restored from its snapshot
+from emulator import Emulator
+
+class Pool(object):
+
+    __slots__ = ('options', 'snapshots', 'idle')
+
+    def __init__(self, **options) -> None:
+        # options of Emulator, RAM is kept in memory unless a savePath is given
+        options.setdefault('savePath', '')
+        self.options = options
+        # (rom, frames) -> snapshot of the machine
+        self.snapshots = {}
+        # (rom, frames) -> emulators ready to be handed out
+        self.idle = {}
+
+    def snapshot(self, rom: str, frames: int=0, prepare=None) -> tuple:
+        # prepare(emu) brings a fresh emulator to the wanted state, e.g. past the title screen,
+        # it defaults to running the given number of frames
+        key = (rom, frames)
+        if key not in self.snapshots:
+            emu = Emulator(rom, **self.options)
+            if prepare is None:
+                emu.run(frames)
+            else:
+                prepare(emu)
+            self.snapshots[key] = emu.snapshot()
+            emu.resetState = self.snapshots[key]
+            self.idle.setdefault(key, []).append(emu)
+        return self.snapshots[key]
+
+    def fill(self, rom: str, count: int, frames: int=0, prepare=None) -> None:
+        key = (rom, frames)
+        state = self.snapshot(rom, frames, prepare)
+        idle = self.idle.setdefault(key, [])
+        while len(idle) < count:
+            emu = Emulator(rom, **self.options)
+            emu.resetState = state
+            emu.reset()
+            idle.append(emu)
+
+    def acquire(self, rom: str, frames: int=0, prepare=None) -> Emulator:
+        key = (rom, frames)
+        state = self.snapshot(rom, frames, prepare)
+        idle = self.idle.get(key)
+        if idle:
+            emu = idle.pop()
+        else:
+            emu = Emulator(rom, **self.options)
+            emu.resetState = state
+        emu.reset()
+        return emu
+
+    def release(self, emu: Emulator) -> None:
+        # the emulator is reset when handed out again
+        for key, state in self.snapshots.items():
+            if state is emu.resetState:
+                self.idle.setdefault(key, []).append(emu)
+                return
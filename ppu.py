@@ -1,7 +1,8 @@
 # picture processing unit
 import pygame, sys, os, time
+from presenter import Presenter
 from z80 import IF_STAT, IF_VBLANK
-from utils import getBit, setBit, getColor, Tile, SpriteTile8, SpriteTile16, toHex
+from utils import getBit, setBit, Tile, Sprite, toHex, NEVER, SHADES, ZERO_MASK, NONZERO_MASK
 
 # instruction
 INSTRUCTION = '''
@@ -25,6 +26,8 @@ INSTRUCTION = '''
                     Key-P to pause
                     Key-S to save screenshot
                     Key-C to clear outputs
+                    Key-T to toggle turbo
+                    Key-G to print pacing
 
                     Key-R to print registers
                     Key-M & 1 to print tile field 1 (0x8000 ~ 0x9000)
@@ -75,228 +78,321 @@ class PPU(object):
     V_BLANK_TIME = 456
     OAM_SCANLINE_TIME = 80
     VRAM_SCANLINE_TIME = 172
+    # timestamps relative to the start of a line / a frame
+    H_BLANK_START = OAM_SCANLINE_TIME + VRAM_SCANLINE_TIME
+    LINE_TIME = 456
+    V_BLANK_START = ROWS * LINE_TIME
+    FRAME_TIME = 154 * LINE_TIME
     # option
     NOSTALGIC = False
 
     __slots__ = (
         'emu',
-        'LCD', 'buffer', 'cache',
-        'scx', 'scy', 'clk',
+        'LCD', 'presenter', 'buffer', 'bgIndex', 'frame', 'cache', 'tileDirty', 'redrawn', 'sprites',
+        'scx', 'scy', 'frameStart', 'nextEvent', 'present', 'frameskip', 'skipped',
         'dir', 'std'
     )
 
-    def __init__(self, emu, nostalgic: bool) -> None:
+    def __init__(self, emu, nostalgic: bool, frameskip: int=0, threaded: bool=False) -> None:
         # reference of emulator
         self.emu = emu
-        # main screen
+        # main screen, frames are scaled and shown by the presenter
         pygame.init()
         self.LCD = pygame.display.set_mode((COLS * RESIZE, ROWS * RESIZE), pygame.DOUBLEBUF)
-        self.buffer = pygame.Surface((256 * RESIZE, 256 * RESIZE))
+        self.presenter = Presenter(self.LCD, (COLS, ROWS), nostalgic, threaded)
+        # colour indices (0 ~ 3) of the 256 x 256 background and of background and window on screen,
+        # which sprite priority is resolved against, and shades (0 ~ 3) of the visible frame
+        self.buffer = bytearray(256 * 256)
+        self.bgIndex = bytearray(COLS * ROWS)
+        self.frame = bytearray(COLS * ROWS)
         self.cache = bytearray((0xFF,) * 0x400)
+        # tiles of 0x8000 ~ 0x97FF written since the background was last drawn
+        self.tileDirty = bytearray(0x180)
+        # tiles drawn again by the last renderBackground
+        self.redrawn = 0
+        # decoded OAM entries, None once written to
+        self.sprites = [None] * 40
         self.scx, self.scy = 0, 0
-        self.clk = 0
+        # LY and STAT are derived from the cycle stamp of line 0 when accessed,
+        # only interrupts and vblank are scheduled as events
+        self.frameStart = 0
+        self.nextEvent = NEVER
+        # whether the coming frame is shown, cleared by the governor to skip frames
+        self.present = True
+        # only 1 of frameskip + 1 frames is drawn, timing and interrupts go on for the others
+        self.frameskip = frameskip
+        self.skipped = 0
         # key input
         self.dir, self.std = 0xF, 0xF
         # set color option
         PPU.NOSTALGIC = nostalgic
     
-    def tick(self, cyclesPassed: int) -> None:
-        if getBit(self.emu.read(LCDC_ADDR), LCDC_LCD_EN):
-            mode = getBit(self.emu.read(STAT_ADDR), STAT_LCD_MODE, bit2=True)
-            self.clk += cyclesPassed
-            if mode == PPU.OAM_READ_MODE:
-
-                if self.clk >= PPU.OAM_SCANLINE_TIME:
-                    self.clk -= PPU.OAM_SCANLINE_TIME
-                    self.updateMode(PPU.VRAM_READ_MODE)
-                
-            elif mode == PPU.VRAM_READ_MODE:
-
-                if self.clk >= PPU.VRAM_SCANLINE_TIME:
-                    self.clk -= PPU.VRAM_SCANLINE_TIME
-                    self.updateMode(PPU.H_BLANK_MODE)
-                
-            elif mode == PPU.H_BLANK_MODE:
-
-                if self.clk >= PPU.H_BLANK_TIME:
-                    self.clk -= PPU.H_BLANK_TIME
-                    y = self.emu.read(LY_ADDR) + 1
-                    self.updateLY(y)
-                    if y == 0x90: # 144
-                        self.updateMode(PPU.V_BLANK_MODE)
-                        self.render()
-                        self.emu.z80.setInterrupt(IF_VBLANK)
-                        # whole frame ready, prepare to show a new screen and handle inputs
-                        self.emu.frames += 1
-                        self.updateLCD()
-                    else:
-                        self.updateMode(PPU.OAM_READ_MODE)
-                    
-            elif mode == PPU.V_BLANK_MODE:
-
-                if self.clk >= PPU.V_BLANK_TIME:
-                    self.clk -= PPU.V_BLANK_TIME
-                    y = self.emu.read(LY_ADDR) + 1
-                    if y == 0x9A: # 154
-                        self.updateMode(PPU.OAM_READ_MODE)
-                        self.updateLY(0)
-                    else:
-                        self.updateLY(y)
-
-    def updateLY(self, y: int) -> None:
-        self.emu.write(LY_ADDR, y)
-        lyc = self.emu.read(LYC_ADDR)
-        stat = self.emu.read(STAT_ADDR)
-        if y == lyc:
-            self.emu.write(STAT_ADDR, setBit(stat, STAT_LYC_STAT, 1))
-            if getBit(self.emu.read(STAT_ADDR), STAT_INTR_LYC):
+    def snapshot(self) -> tuple:
+        # the background buffer goes with the tile cache which tells what is drawn in it
+        return (
+            bytes(self.cache), bytes(self.tileDirty), bytes(self.buffer),
+            self.scx, self.scy, self.frameStart, self.nextEvent, self.skipped, self.dir, self.std
+        )
+
+    def restore(self, state: tuple) -> None:
+        cache, tileDirty, buffer, self.scx, self.scy, self.frameStart, self.nextEvent, self.skipped, self.dir, self.std = state
+        self.cache[:] = cache
+        self.tileDirty[:] = tileDirty
+        self.buffer[:] = buffer
+        self.sprites[:] = [None] * 40
+
+    def sync(self) -> None:
+        now = self.emu.cycles
+        while self.nextEvent <= now:
+            self.fire(self.nextEvent)
+        self.updateRegisters(now)
+        self.emu.schedule()
+
+    def write(self, addr: int, byte: int) -> None:
+        # registers are accessed directly, reading them through mmu would sync again
+        mem = self.emu.mmu.bytes
+        self.sync()
+        if addr == LCDC_ADDR:
+            enabled = getBit(mem[LCDC_ADDR], LCDC_LCD_EN)
+            if getBit(mem[LCDC_ADDR] ^ byte, LCDC_TILE_SEL):
+                # same indices, other tiles
+                self.tileDirty[:] = b'\x01' * len(self.tileDirty)
+            if getBit(mem[LCDC_ADDR] ^ byte, LCDC_OBJ_SIZE):
+                self.sprites[:] = [None] * 40
+            mem[LCDC_ADDR] = byte
+            if getBit(byte, LCDC_LCD_EN) and not enabled:
+                # restart from line 0
+                self.frameStart = self.emu.cycles
+            elif not getBit(byte, LCDC_LCD_EN):
+                mem[LY_ADDR] = 0
+                mem[STAT_ADDR] = setBit(mem[STAT_ADDR], STAT_LCD_MODE, PPU.H_BLANK_MODE, bit2=True)
+        elif addr == STAT_ADDR:
+            # mode and coincidence bits are read only
+            mem[STAT_ADDR] = (byte & 0xF8) | (mem[STAT_ADDR] & 0x07)
+        elif addr == LYC_ADDR:
+            mem[LYC_ADDR] = byte
+        # LY is read only
+        self.updateRegisters(self.emu.cycles)
+        self.reschedule(self.emu.cycles)
+        self.emu.schedule()
+
+    def fire(self, t: int) -> None:
+        mem = self.emu.mmu.bytes
+        while t - self.frameStart >= PPU.FRAME_TIME:
+            self.frameStart += PPU.FRAME_TIME
+        y, dot = divmod(t - self.frameStart, PPU.LINE_TIME)
+        self.updateRegisters(t)
+        stat = mem[STAT_ADDR]
+
+        if dot == 0:
+            if y == mem[LYC_ADDR] and getBit(stat, STAT_INTR_LYC):
+                self.emu.z80.setInterrupt(IF_STAT)
+            if y == ROWS:
+                if getBit(stat, STAT_INTR_M1):
+                    self.emu.z80.setInterrupt(IF_STAT)
+                # pixels are only made for frames that are shown
+                shown = self.present and self.skipped >= self.frameskip
+                if shown:
+                    self.render()
+                self.emu.z80.setInterrupt(IF_VBLANK)
+                # whole frame ready, prepare to show a new screen and handle inputs
+                self.emu.frames += 1
+                if shown:
+                    self.updateLCD()
+                    self.skipped = 0
+                else:
+                    self.skipped += 1
+            elif y < ROWS and getBit(stat, STAT_INTR_M2):
                 self.emu.z80.setInterrupt(IF_STAT)
+        elif getBit(stat, STAT_INTR_M0):
+            self.emu.z80.setInterrupt(IF_STAT)
+
+        self.reschedule(t)
+
+    def reschedule(self, t: int) -> None:
+        mem = self.emu.mmu.bytes
+        if not getBit(mem[LCDC_ADDR], LCDC_LCD_EN):
+            self.nextEvent = NEVER
+            return
+
+        pos = (t - self.frameStart) % PPU.FRAME_TIME
+        y, dot = divmod(pos, PPU.LINE_TIME)
+        stat = mem[STAT_ADDR]
+        # candidates relative to the start of current frame
+        events = [PPU.V_BLANK_START]
+        if getBit(stat, STAT_INTR_M2):
+            events.append((y + 1) * PPU.LINE_TIME if y + 1 < ROWS else PPU.FRAME_TIME)
+        if getBit(stat, STAT_INTR_M0):
+            if y < ROWS and dot < PPU.H_BLANK_START:
+                events.append(y * PPU.LINE_TIME + PPU.H_BLANK_START)
+            elif y + 1 < ROWS:
+                events.append((y + 1) * PPU.LINE_TIME + PPU.H_BLANK_START)
+            else:
+                events.append(PPU.FRAME_TIME + PPU.H_BLANK_START)
+        if getBit(stat, STAT_INTR_LYC) and mem[LYC_ADDR] < 154:
+            events.append(mem[LYC_ADDR] * PPU.LINE_TIME)
+
+        self.nextEvent = t - pos + min(e if e > pos else e + PPU.FRAME_TIME for e in events)
+
+    def updateRegisters(self, t: int) -> None:
+        mem = self.emu.mmu.bytes
+        if not getBit(mem[LCDC_ADDR], LCDC_LCD_EN): return
+
+        y, dot = divmod((t - self.frameStart) % PPU.FRAME_TIME, PPU.LINE_TIME)
+        if y >= ROWS:
+            mode = PPU.V_BLANK_MODE
+        elif dot < PPU.OAM_SCANLINE_TIME:
+            mode = PPU.OAM_READ_MODE
+        elif dot < PPU.H_BLANK_START:
+            mode = PPU.VRAM_READ_MODE
         else:
-            self.emu.write(STAT_ADDR, setBit(stat, STAT_LYC_STAT, 0))
-    
-    def updateMode(self, mode: int) -> None:
-        stat = setBit(self.emu.read(STAT_ADDR), STAT_LCD_MODE, mode, bit2=True)
-        self.emu.write(STAT_ADDR, stat)
+            mode = PPU.H_BLANK_MODE
+        stat = setBit(mem[STAT_ADDR], STAT_LCD_MODE, mode, bit2=True)
+        mem[LY_ADDR] = y
+        mem[STAT_ADDR] = setBit(stat, STAT_LYC_STAT, int(y == mem[LYC_ADDR]))
 
-        if getBit(stat, mode + 3) and mode != 3:
-            self.emu.z80.setInterrupt(IF_STAT)
-    
     def updateLCD(self) -> None:
-        # *********
-        # * 1 * 2 *
-        # *********
-        # * 3 * 4 *
-        # *********
-        # part 1
-        self.LCD.blit(
-            self.buffer,
-            (0, 0),
-            pygame.Rect(
-                self.scx * RESIZE,
-                self.scy * RESIZE,
-                min(256 - self.scx, COLS) * RESIZE,
-                min(256 - self.scy, ROWS) * RESIZE
-            )
-        )
-        # part 2
-        if self.scx > 96:
-            self.LCD.blit(
-                self.buffer,
-                ((256 - self.scx) * RESIZE, 0),
-                pygame.Rect(
-                    0,
-                    self.scy * RESIZE,
-                    (self.scx - 96) * RESIZE,
-                    min(256 - self.scy, ROWS) * RESIZE
-                )
-            )
-        # part 3
-        if self.scy > 112:
-            self.LCD.blit(
-                self.buffer,
-                (0, (256 - self.scy) * RESIZE),
-                pygame.Rect(
-                    self.scx * RESIZE,
-                    0,
-                    min(256 - self.scx, COLS) * RESIZE,
-                    (self.scy - 112) * RESIZE
-                )
-            )
-        # part 4
-        if self.scx > 96 and self.scy > 112:
-            self.LCD.blit(
-                self.buffer,
-                ((256 - self.scx) * RESIZE, (256 - self.scy) * RESIZE),
-                pygame.Rect(
-                    0,
-                    0,
-                    (self.scx - 96) * RESIZE,
-                    (self.scy - 112) * RESIZE
-                )
-            )
-        pygame.display.flip()
+        # the frame is copied, the presenter may show it while the next one is drawn
+        self.presenter.push(bytes(self.frame))
 
     def render(self) -> None:
-        self.scx = self.emu.read(SCX_ADDR)
-        self.scy = self.emu.read(SCY_ADDR)
-        pixels = pygame.PixelArray(self.buffer)
-        self.renderBackground(pixels)
-        self.renderWindow(pixels)
-        self.renderSprites(pixels)
-        del pixels
-    
-    def renderBackground(self, pixels: pygame.PixelArray) -> None:
-        lcdc = self.emu.read(LCDC_ADDR)
+        # video memory is read directly, the cpu bus may be blocked by DMA
+        mem = self.emu.mmu.bytes
+        self.scx = mem[SCX_ADDR]
+        self.scy = mem[SCY_ADDR]
+        self.renderBackground()
+        self.scroll()
+        self.renderWindow()
+        self.compose()
+        self.renderSprites()
+
+    def renderBackground(self) -> None:
+        # the whole 256 x 256 background map is kept drawn in buffer, only changed tiles are drawn again
+        mem = self.emu.mmu.bytes
+        lcdc = mem[LCDC_ADDR]
+        self.redrawn = 0
         if not getBit(lcdc, LCDC_BG_EN): return
 
         mapAddr = 0x9C00 if getBit(lcdc, LCDC_BG_MAP) else 0x9800
 
         for offset in range(0x400):
-            tileIdx = self.emu.read(mapAddr + offset)
-            if getBit(lcdc, LCDC_TILE_SEL):
-                tileAddr = 0x8000
-            else:
-                tileAddr = 0x8800
-                tileIdx = (tileIdx - 0x100) & 0xFF
-            
-            if self.cache[offset] == tileIdx:
+            tileIdx = mem[mapAddr + offset]
+            # drawn again when another tile is mapped or its data was written
+            addr = PPU.tileAddr(lcdc, tileIdx)
+            if self.cache[offset] == tileIdx and not self.tileDirty[(addr - 0x8000) >> 4]:
                 continue
             else:
                 self.cache[offset] = tileIdx
+                self.redrawn += 1
 
-            tile = Tile(self.emu, tileAddr + tileIdx * 0x10)
+            tile = Tile(mem, addr)
+            pos = offset // 32 * 8 * 256 + offset % 32 * 8
             for dy in range(tile.ROWS):
-                for dx in range(tile.COLS):
-                    PPU.fill(offset % 32 * 8 + dx, offset // 32 * 8 + dy, tile.pixels[dy][dx], pixels)
+                self.buffer[pos + dy * 256:pos + dy * 256 + 8] = bytes(tile.pixels[dy])
             del tile
-    
-    def renderWindow(self, pixels: pygame.PixelArray) -> None:
-        lcdc = self.emu.read(LCDC_ADDR)
+        # the tiles in use are all drawn now, the others are checked when mapped,
+        # decoded sprites are dropped before forgetting which tiles changed
+        for idx, sprite in enumerate(self.sprites):
+            if sprite is not None and any(self.tileDirty[tile] for tile in sprite.tiles):
+                self.sprites[idx] = None
+        self.tileDirty[:] = bytes(len(self.tileDirty))
+
+    def scroll(self) -> None:
+        # visible part of the background, wrapping around its edges
+        bgIndex = self.bgIndex
+        if not getBit(self.emu.mmu.bytes[LCDC_ADDR], LCDC_BG_EN):
+            bgIndex[:] = bytes(len(bgIndex))
+            return
+        width = min(256 - self.scx, COLS)
+        for y in range(ROWS):
+            src = ((self.scy + y) & 0xFF) * 256
+            dst = y * COLS
+            bgIndex[dst:dst + width] = self.buffer[src + self.scx:src + self.scx + width]
+            if width < COLS:
+                bgIndex[dst + width:dst + COLS] = self.buffer[src:src + COLS - width]
+
+    def compose(self) -> None:
+        # shades of background and window through BGP, white while the background is off
+        mem = self.emu.mmu.bytes
+        if not getBit(mem[LCDC_ADDR], LCDC_BG_EN) and not getBit(mem[LCDC_ADDR], LCDC_WIN_EN):
+            self.frame[:] = bytes(len(self.frame))
+            return
+        self.frame[:] = self.bgIndex.translate(SHADES[mem[Tile.BGP_ADDR]])
+
+    def renderWindow(self) -> None:
+        mem = self.emu.mmu.bytes
+        lcdc = mem[LCDC_ADDR]
         if not getBit(lcdc, LCDC_WIN_EN): return
 
         mapAddr = 0x9C00 if getBit(lcdc, LCDC_WIN_MAP) else 0x9800
-        wx, wy = self.emu.read(WX_ADDR) - 7, self.emu.read(WY_ADDR)
+        wx, wy = mem[WX_ADDR] - 7, mem[WY_ADDR]
+        if wx >= COLS or wy >= ROWS: return
 
         for offset in range(0x400):
-            tileIdx = self.emu.read(mapAddr + offset)
-            if getBit(lcdc, LCDC_TILE_SEL):
-                tileAddr = 0x8000
-            else:
-                tileAddr = 0x8800
-                tileIdx -= 0x100
-            
-            tile = Tile(self.emu, tileAddr + tileIdx * 16)
+            # tiles past the screen are not decoded
+            if wy + offset // 32 * 8 >= ROWS or wx + offset % 32 * 8 >= COLS: continue
+            tile = Tile(mem, PPU.tileAddr(lcdc, mem[mapAddr + offset]))
             for dy in range(tile.ROWS):
                 y = wy + offset // 32 * 8 + dy
                 if not (0 <= y < ROWS): continue
                 for dx in range(tile.COLS):
                     x = wx + offset % 32 * 8 + dx
                     if not (0 <= x < COLS): continue
-                    PPU.fill(x, y, tile.pixels[dy][dx], pixels)
+                    self.bgIndex[y * COLS + x] = tile.pixels[dy][dx]
             del tile
-    
-    def renderSprites(self, pixels: pygame.PixelArray) -> None:
-        lcdc = self.emu.read(LCDC_ADDR)
+
+    def renderSprites(self) -> None:
+        mem = self.emu.mmu.bytes
+        lcdc = mem[LCDC_ADDR]
         if not getBit(lcdc, LCDC_OBJ_EN): return
 
-        Sprite = SpriteTile16 if getBit(lcdc, LCDC_OBJ_SIZE) else SpriteTile8
-        
-        for addr in range(0xFE00, 0xFEA0, 4):
-            tile = Sprite(self.emu, addr)
-            for dy in range(tile.ROWS):
-                if not (0 <= tile.y + dy < ROWS): continue
-                for dx in range(tile.COLS):
-                    if not (0 <= tile.x + dx < COLS): continue
+        height = 16 if getBit(lcdc, LCDC_OBJ_SIZE) else 8
+        # OAM scan: the first 10 entries covering a line are shown on it, off-screen X included
+        lines = [[] for _ in range(ROWS)]
+        for idx in range(40):
+            y = mem[0xFE00 + idx * 4] - 16
+            if y >= ROWS or y + height <= 0: continue
+            sprite = self.sprites[idx]
+            if sprite is None or any(self.tileDirty[tile] for tile in sprite.tiles):
+                sprite = self.sprites[idx] = Sprite(mem, 0xFE00 + idx * 4, height)
+            for line in range(max(y, 0), min(y + height, ROWS)):
+                if len(lines[line]) < 10:
+                    lines[line].append((sprite.x, idx, sprite))
 
-                    x, y = self.scx + tile.x + dx, self.scy + tile.y + dy
-                    if tile.priority or pixels[x * RESIZE, y * RESIZE] == getColor(0, PPU.NOSTALGIC):
-                        if tile.pixels[dy][dx] < 0: continue
-                        PPU.fill(x, y, tile.pixels[dy][dx], pixels)
-            del tile
+        palettes = {addr: SHADES[mem[addr]] for addr in (Sprite.OBP0_ADDR, Sprite.OBP1_ADDR)}
+        frame, bgIndex = self.frame, self.bgIndex
+        for line, entries in enumerate(lines):
+            if not entries: continue
+            # smaller X then smaller index wins, so those are drawn last
+            entries.sort(reverse=True)
+            pos = line * COLS
+            for x, idx, sprite in entries:
+                left, right = max(-x, 0), min(COLS - x, 8)
+                if left >= right: continue
+                # a row is merged as one integer, drawn where it is not colour 0 and,
+                # for sprites behind, where background and window are colour 0
+                row = sprite.rows[line - sprite.y][left:right]
+                start, end = pos + x + left, pos + x + right
+                mask = int.from_bytes(row.translate(NONZERO_MASK), 'little')
+                if sprite.behind:
+                    mask &= int.from_bytes(bgIndex[start:end].translate(ZERO_MASK), 'little')
+                if not mask: continue
+                shades = int.from_bytes(row.translate(palettes[sprite.obp]), 'little')
+                under = int.from_bytes(frame[start:end], 'little')
+                frame[start:end] = (under & ~mask | shades & mask).to_bytes(end - start, 'little')
+
+    @staticmethod
+    def tileAddr(lcdc: int, tileIdx: int) -> int:
+        # 0x8000 ~ 0x8FFF with unsigned indices, or 0x8800 ~ 0x97FF with signed ones around 0x9000
+        if getBit(lcdc, LCDC_TILE_SEL):
+            return 0x8000 + tileIdx * 0x10
+        return 0x9000 + ((tileIdx ^ 0x80) - 0x80) * 0x10
     
     def handleEvents(self) -> None:
 
         def quit() -> None:
+            self.emu.mmu.mbc.close()
+            self.presenter.close()
             pygame.display.quit()
             pygame.quit()
             sys.exit()
@@ -346,10 +442,18 @@ class PPU(object):
                     # screenshot
                     if not os.path.exists(SCREENSHOT_PATH):
                         os.mkdir(SCREENSHOT_PATH)
-                    pygame.image.save(self.LCD, f'{SCREENSHOT_PATH}/screenshot_{toHex(int(time.time()))}.jpg')
+                    self.presenter.screenshot(f'{SCREENSHOT_PATH}/screenshot_{toHex(int(time.time()))}.jpg')
                 elif keys[pygame.K_c]:
                     # clear console output
                     os.system('clear')
+                elif keys[pygame.K_t]:
+                    # turbo, back to real time when pressed again
+                    if self.emu.governor is not None:
+                        self.emu.governor.setSpeed(0 if self.emu.governor.speed else 1.0)
+                elif keys[pygame.K_g]:
+                    # pacing
+                    if self.emu.governor is not None:
+                        self.emu.governor.report()
                 elif keys[pygame.K_r]:
                     # print registers
                     self.emu.printReg()
@@ -405,13 +509,3 @@ class PPU(object):
             return self.dir & 0xF
         else:
             return 0
-    
-    @staticmethod
-    def fill(x: int, y: int, colorCode: int, pixels: pygame.PixelArray) -> None:
-        for dy in range(RESIZE):
-            for dx in range(RESIZE):
-                pixels[x * RESIZE + dx, y * RESIZE + dy] = getColor(colorCode, PPU.NOSTALGIC)
-
-    @staticmethod
-    def delay(ms: int) -> None:
-        pygame.time.delay(ms)
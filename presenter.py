@@ -0,0 +1,108 @@
+# presentation of frames
+# finished frames are handed to a thread which scales, blits and flips them, the emulation never waits on the display
+# the thread makes video calls off the thread of the window, which only some SDL backends allow
+# (e.g. x11, dummy, not cocoa), so it is opt-in and frames are shown right away by default
+import threading
+from collections import deque
+import pygame
+from utils import RGB
+
+class Presenter(object):
+    # frames are bytes of shades (0 ~ 3) of cols x rows pixels,
+    # only the bands of rows changed since the previous frame reach the display
+
+    __slots__ = (
+        'LCD', 'size', 'scale', 'palette', 'queue', 'ready', 'threaded', 'thread', 'running',
+        'last', 'shown', 'dropped', 'unchanged'
+    )
+
+    def __init__(self, LCD: pygame.Surface, size: tuple, nostalgic: bool, threaded: bool=False, depth: int=2) -> None:
+        self.LCD = LCD
+        self.size = size
+        self.scale = (LCD.get_width() // size[0], LCD.get_height() // size[1])
+        # shades to RGB, applied by SDL when blitting
+        self.palette = RGB[int(nostalgic)]
+        # bounded, the oldest frame is dropped when the display falls behind
+        self.queue = deque(maxlen=depth)
+        self.ready = threading.Event()
+        # without a thread frames are shown right away, the thread is started by the first frame
+        self.threaded = threaded
+        self.thread = None
+        self.running = False
+        # previous frame shown
+        self.last = None
+        self.shown = 0
+        self.dropped = 0
+        self.unchanged = 0
+
+    def push(self, frame: bytes) -> None:
+        if not self.threaded:
+            self.show(frame)
+            return
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.loop, name='presenter', daemon=True)
+            self.thread.start()
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(frame)
+        self.ready.set()
+
+    def loop(self) -> None:
+        while self.running:
+            self.ready.wait()
+            self.ready.clear()
+            while self.running and self.queue:
+                self.show(self.queue.popleft())
+
+    def show(self, frame: bytes) -> None:
+        if frame == self.last:
+            # e.g. paused or static screens
+            self.unchanged += 1
+            return
+        cols, rows = self.size
+        scaleX, scaleY = self.scale
+        surface = pygame.image.frombuffer(frame, self.size, 'P')
+        surface.set_palette(self.palette)
+        rects = []
+        for top, bottom in self.changedRows(frame):
+            band = surface.subsurface((0, top, cols, bottom - top))
+            rect = pygame.Rect(0, top * scaleY, cols * scaleX, (bottom - top) * scaleY)
+            self.LCD.blit(pygame.transform.scale(band, rect.size), rect)
+            rects.append(rect)
+        pygame.display.update(rects)
+        self.last = frame
+        self.shown += 1
+
+    def screenshot(self, path: str) -> None:
+        # taken from the last frame shown, the display surface belongs to the presenting thread
+        frame = self.last
+        if frame is None: return
+        surface = pygame.image.frombuffer(frame, self.size, 'P')
+        surface.set_palette(self.palette)
+        pygame.image.save(pygame.transform.scale(surface, self.LCD.get_size()), path)
+
+    def changedRows(self, frame: bytes) -> list:
+        # [top, bottom) of each band of consecutive rows that differ from the previous frame
+        cols, rows = self.size
+        if self.last is None or len(self.last) != len(frame):
+            return [(0, rows)]
+        bands = []
+        last = self.last
+        top = None
+        for y in range(rows + 1):
+            changed = y < rows and frame[y * cols:(y + 1) * cols] != last[y * cols:(y + 1) * cols]
+            if changed and top is None:
+                top = y
+            elif not changed and top is not None:
+                bands.append((top, y))
+                top = None
+        return bands
+
+    def close(self) -> None:
+        # must be called before the display is closed
+        if self.thread is None: return
+        self.running = False
+        self.ready.set()
+        self.thread.join()
+        self.thread = None
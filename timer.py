@@ -1,6 +1,6 @@
 # timer
 from z80 import IF_TIMER
-from utils import getBit
+from utils import getBit, NEVER
 # addresses of registers
 DIV_ADDR  = 0xFF04
 TIMA_ADDR = 0xFF05
@@ -10,46 +10,73 @@ TAC_ADDR  = 0xFF07
 class Timer(object):
 
     DIVIDERS = (1024, 16, 64, 256)
-    __slots__ = ('emu', 'divCounter', 'timaCounter')
+    __slots__ = ('emu', 'divBase', 'lastSync', 'nextEvent')
 
     def __init__(self, emu) -> None:
         # reference of emulator
         self.emu = emu
-        self.divCounter = 0
-        self.timaCounter = 0
-    
-    def tick(self, cyclesPassed: int) -> None:
-        # update the value of DIV
-        div = self.emu.read(DIV_ADDR)
-        self.divCounter += cyclesPassed
-        div += self.divCounter >> 8
-        self.divCounter &= 0xFF
-        self.emu.write(DIV_ADDR, div & 0xFF)
-
-        tac = self.emu.read(TAC_ADDR)
-        # timer not enabled
-        if getBit(tac, 2) == 0: return
-        
-        self.timaCounter += cyclesPassed
-        divider = Timer.DIVIDERS[getBit(tac, 0, bit2=True)]
-        tima = self.emu.read(TIMA_ADDR)
-
-        if self.timaCounter >= divider:
-            self.timaCounter -= divider
-            tima += 1
-            if tima > 0xFF:
-                tima = self.emu.read(TMA_ADDR) & 0xFF
-                self.emu.write(TIMA_ADDR, tima)
-                self.emu.z80.setInterrupt(IF_TIMER)
-            else:
-                self.emu.write(TIMA_ADDR, tima)
-    
+        # the internal 16-bit divider is the number of cycles since divBase,
+        # DIV being its upper 8 bits
+        self.divBase = 0
+        # TIMA is brought up to date lazily, on access or at its overflow
+        self.lastSync = 0
+        self.nextEvent = NEVER
+
+    def snapshot(self) -> tuple:
+        return self.divBase, self.lastSync, self.nextEvent
+
+    def restore(self, state: tuple) -> None:
+        self.divBase, self.lastSync, self.nextEvent = state
+
+    def readDIV(self) -> int:
+        return ((self.emu.cycles - self.divBase) >> 8) & 0xFF
+
+    def sync(self) -> None:
+        tac = self.emu.mmu.bytes[TAC_ADDR]
+        # timer enabled
+        if getBit(tac, 2):
+            divider = Timer.DIVIDERS[getBit(tac, 0, bit2=True)]
+            # TIMA counts the falling edges of a bit of the divider
+            ticks = (self.emu.cycles - self.divBase) // divider - (self.lastSync - self.divBase) // divider
+            self.countUp(ticks)
+        self.lastSync = self.emu.cycles
+        self.reschedule()
+
+    def countUp(self, ticks: int) -> None:
+        # registers are accessed directly, reading them through mmu would sync again
+        mem = self.emu.mmu.bytes
+        tima = mem[TIMA_ADDR] + ticks
+        while tima > 0xFF:
+            tima += mem[TMA_ADDR] - 0x100
+            self.emu.z80.setInterrupt(IF_TIMER)
+        mem[TIMA_ADDR] = tima
+
+    def write(self, addr: int, byte: int) -> None:
+        self.sync()
+        if addr == DIV_ADDR:
+            # any write resets the divider
+            tac = self.emu.mmu.bytes[TAC_ADDR]
+            if getBit(tac, 2):
+                divider = Timer.DIVIDERS[getBit(tac, 0, bit2=True)]
+                if (self.emu.cycles - self.divBase) % divider >= divider >> 1:
+                    # the bit watched by TIMA falls from 1 to 0
+                    self.countUp(1)
+            self.divBase = self.emu.cycles
+        else:
+            self.emu.mmu.bytes[addr] = byte
+        self.reschedule()
+
+    def reschedule(self) -> None:
+        self.nextEvent = self.lastSync + self.cycles2interrupt()
+        self.emu.schedule()
+
     def cycles2interrupt(self) -> int:
-        tac = self.emu.read(TAC_ADDR)
+        mem = self.emu.mmu.bytes
+        tac = mem[TAC_ADDR]
         if getBit(tac, 2):
             divider = Timer.DIVIDERS[getBit(tac, 0, bit2=True)]
-            cyclesLeft = ((0x100 - self.emu.read(TIMA_ADDR)) * divider) - self.timaCounter
+            cyclesLeft = ((0x100 - mem[TIMA_ADDR]) * divider) - (self.lastSync - self.divBase) % divider
             return cyclesLeft
         else:
-            # timer not enabled, return a large enough value
-            return 1 << 16
+            # timer not enabled, no overflow to wait for
+            return NEVER
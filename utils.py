@@ -26,79 +26,60 @@ COLORS = [
     (0xFFFFFF, 0xB2B2B2, 0x666666, 0x000000),
     (0x9BBC0F, 0x8BAC0F, 0x306230, 0x0F380F)
 ]
-def getColor(colorCode: int, nostalgic: bool) -> int:
-    return COLORS[int(nostalgic)][colorCode]
+# shades to (r, g, b) of each scheme
+RGB = [[((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF) for color in scheme] for scheme in COLORS]
+
+# value of BGP / OBP0 / OBP1 to a table translating colour indices to shades, for bytes.translate
+# (only the lowest 2 bits of an index are looked at)
+SHADES = [bytes(getBit(value, (idx & 0x03) * 2, bit2=True) for idx in range(0x100)) for value in range(0x100)]
+# colour indices to masks of 0xFF, for the pixels of colour 0 and for the others
+ZERO_MASK = bytes(0xFF if not idx & 0x03 else 0x00 for idx in range(0x100))
+NONZERO_MASK = bytes(0x00 if not idx & 0x03 else 0xFF for idx in range(0x100))
 
 class Tile(object):
+    # colour indices (0 ~ 3) of a tile, the palette is applied when the frame is composed
 
     ROWS, COLS = 8, 8
     BGP_ADDR = 0xFF47
 
-    def __init__(self, emu, addr: int) -> None:
-        self.palette = emu.read(self.BGP_ADDR)
+    def __init__(self, mem: bytearray, addr: int) -> None:
         self.pixels = [[0] * self.COLS for _ in range(self.ROWS)]
-        self.initPixels(emu, addr)
+        self.initPixels(mem, addr)
 
-    def initPixels(self, emu, addr: int) -> None:
+    def initPixels(self, mem: bytearray, addr: int) -> None:
         for y in range(self.ROWS):
             dst = addr + y * 2
-            byte1 = emu.read(dst)
-            byte2 = emu.read(dst + 1)
+            byte1 = mem[dst]
+            byte2 = mem[dst + 1]
             for x in range(self.COLS):
-                colorIdx = decodeColor(byte1, byte2, x)
-                self.pixels[y][x] = getBit(self.palette, colorIdx * 2, bit2=True)
+                self.pixels[y][x] = decodeColor(byte1, byte2, x)
 
-class SpriteTile(object):
+class Sprite(object):
+    # OAM entry decoded to colour indices (0 is transparent), flips applied
 
-    ROWS, COLS = 8, 8
     OBP0_ADDR = 0xFF48
     OBP1_ADDR = 0xFF49
-
-    def __init__(self, emu, addr: int) -> None:
-        self.y = emu.read(addr) - 16
-        self.x = emu.read(addr + 1) - 8
-
-        flags = emu.read(addr + 3)
-        self.palette = emu.read(self.OBP1_ADDR) if flags & 0x10 else emu.read(self.OBP0_ADDR)
-        self.xFlip = bool(flags & 0b00100000)
-        self.yFlip = bool(flags & 0b01000000)
-        self.priority = flags & 0b10000000 != 0x80
-
-        self.pixels = [[0] * self.COLS for _ in range(self.ROWS)]
-
-    def initPixels(self, emu, selectFunc) -> None:
-        for y in range(self.ROWS):
-            dst = 0x8000 + selectFunc(y) * 0x10 + y * 2
-            byte1 = emu.read(dst)
-            byte2 = emu.read(dst + 1)
-            for x in range(self.COLS):
-                colorIdx = decodeColor(byte1, byte2, x)
-                self.pixels[y][x] = getBit(self.palette, colorIdx * 2, bit2=True) if colorIdx else -1
-
-    def flipPixels(self) -> None:
-        if self.xFlip:
-            self.pixels = [row[::-1] for row in self.pixels]
-        if self.yFlip:
-            self.pixels = self.pixels[::-1]
-
-class SpriteTile8(SpriteTile):
-
-    def __init__(self, emu, addr: int) -> None:
-        super().__init__(emu, addr)
-
-        self.idx = emu.read(addr + 2)
-
-        self.initPixels(emu, lambda y: self.idx)
-        self.flipPixels()
-
-class SpriteTile16(SpriteTile):
-
-    def __init__(self, emu, addr: int) -> None:
-        SpriteTile16.ROWS = 16
-        super().__init__(emu, addr)
-        idx = emu.read(addr + 2)
-        self.lower = idx | 0x01
-        self.upper = idx & 0xFE
-
-        self.initPixels(emu, lambda y: self.lower if y > 7 else self.upper)
-        self.flipPixels()
+    __slots__ = ('y', 'x', 'tiles', 'obp', 'behind', 'rows')
+
+    def __init__(self, mem: bytearray, addr: int, height: int) -> None:
+        self.y = mem[addr] - 16
+        self.x = mem[addr + 1] - 8
+        idx = mem[addr + 2]
+        flags = mem[addr + 3]
+        # the lowest bit of the index is ignored by 8x16 sprites
+        if height == 16:
+            idx &= 0xFE
+        self.tiles = (idx,) if height == 8 else (idx, idx | 0x01)
+        self.obp = self.OBP1_ADDR if flags & 0x10 else self.OBP0_ADDR
+        # only drawn over colour 0 of background and window
+        self.behind = bool(flags & 0x80)
+
+        rows = []
+        for y in range(height):
+            src = 0x8000 + idx * 0x10 + y * 2
+            row = bytes(decodeColor(mem[src], mem[src + 1], x) for x in range(8))
+            rows.append(row[::-1] if flags & 0x20 else row)
+        self.rows = rows[::-1] if flags & 0x40 else rows
+
+# timestamp of an event that is not scheduled
+NEVER = float('inf')
@@ -7,14 +7,19 @@ IF_ADDR = 0xFF0F
 IE_ADDR = 0xFFFF
 # interruptions
 IF_VBLANK, IF_STAT, IF_TIMER, IF_SERIAL, IF_JOYPAD = 0, 1, 2, 3, 4
+INTR_VECTORS = (0x40, 0x48, 0x50, 0x58, 0x60)
+# (flag, vector) to serve for each value of IF & IE, the lowest bit has the highest priority
+INTR_TABLE = ((-1, 0x00),) + tuple(
+    (flag, INTR_VECTORS[flag]) for flag in ((pending & -pending).bit_length() - 1 for pending in range(1, 0x20))
+)
 
 class Z80(object):
 
     __slots__ = (
         'A', 'B', 'C', 'D', 'E', 'F', 'H', 'L',
         'PC', 'SP', 'emu',
-        'halted', 'interruptable', 'pendingIntr',
-        'opcode', 'opname', 'args', 'OP_MAP'
+        'halted', 'interruptable', 'intrPending',
+        'opcode', 'opname', 'args'
     )
 
     def __init__(self, emu) -> None:
@@ -44,173 +49,12 @@ class Z80(object):
         # interrupt
         self.halted = False
         self.interruptable = False
-        self.pendingIntr = 0x00
+        # IF & IE != 0 while IME is set or cpu is halted, recomputed by updateInterrupt
+        self.intrPending = False
         # info of opcode
         self.opcode = 0x00
         self.opname = 'NOP'
         self.args = [0x00, 0x00]
-        self.OP_MAP = [
-            # 0x
-            (NOP_00   , 1, 'NOP'        ),(LD_01    , 3, 'LD BC,d16'  ),(LD_02    , 1, 'LD (BC),A'  ),(INC_03   , 1, 'INC BC'     ),
-            (INC_04   , 1, 'INC B'      ),(DEC_05   , 1, 'DEC B'      ),(LD_06    , 2, 'LD B,d8'    ),(RLCA_07  , 1, 'RLCA'       ),
-            (LD_08    , 3, 'LD (a16),SP'),(ADD_09   , 1, 'ADD HL,BC'  ),(LD_0A    , 1, 'LD A,(BC)'  ),(DEC_0B   , 1, 'DEC BC'     ),
-            (INC_0C   , 1, 'INC C'      ),(DEC_0D   , 1, 'DEC C'      ),(LD_0E    , 2, 'LD C,d8'    ),(RRCA_0F  , 1, 'RRCA'       ),
-            # 1x
-            (STOP_10  , 2, 'STOP 0'     ),(LD_11    , 3, 'LD DE,d16'  ),(LD_12    , 1, 'LD (DE),A'  ),(INC_13   , 1, 'INC DE'     ),
-            (INC_14   , 1, 'INC D'      ),(DEC_15   , 1, 'DEC D'      ),(LD_16    , 2, 'LD D,d8'    ),(RLA_17   , 1, 'RLA'        ),
-            (JR_18    , 2, 'JR r8'      ),(ADD_19   , 1, 'ADD HL,DE'  ),(LD_1A    , 1, 'LD A,(DE)'  ),(DEC_1B   , 1, 'DEC DE'     ),
-            (INC_1C   , 1, 'INC E'      ),(DEC_1D   , 1, 'DEC E'      ),(LD_1E    , 2, 'LD E,d8'    ),(RRA_1F   , 1, 'RRA'        ),
-            # 2x
-            (JR_20    , 2, 'JR NZ,r8'   ),(LD_21    , 3, 'LD HL,d16'  ),(LD_22    , 1, 'LD (HL+),A' ),(INC_23   , 1, 'INC HL'     ),
-            (INC_24   , 1, 'INC H'      ),(DEC_25   , 1, 'DEC H'      ),(LD_26    , 2, 'LD H,d8'    ),(DAA_27   , 1, 'DAA'        ),
-            (JR_28    , 2, 'JR Z,r8'    ),(ADD_29   , 1, 'ADD HL,HL'  ),(LD_2A    , 1, 'LD A,(HL+)' ),(DEC_2B   , 1, 'DEC HL'     ),
-            (INC_2C   , 1, 'INC L'      ),(DEC_2D   , 1, 'DEC L'      ),(LD_2E    , 2, 'LD L,d8'    ),(CPL_2F   , 1, 'CPL'        ),
-            # 3x
-            (JR_30    , 2, 'JR NC,r8'   ),(LD_31    , 3, 'LD SP,d16'  ),(LD_32    , 1, 'LD (HL-),A' ),(INC_33   , 1, 'INC SP'     ),
-            (INC_34   , 1, 'INC (HL)'   ),(DEC_35   , 1, 'DEC (HL)'   ),(LD_36    , 2, 'LD (HL),d8' ),(SCF_37   , 1, 'SCF'        ),
-            (JR_38    , 2, 'JR C,r8'    ),(ADD_39   , 1, 'ADD HL,SP'  ),(LD_3A    , 1, 'LD A,(HL-)' ),(DEC_3B   , 1, 'DEC SP'     ),
-            (INC_3C   , 1, 'INC A'      ),(DEC_3D   , 1, 'DEC A'      ),(LD_3E    , 2, 'LD A,d8'    ),(CCF_3F   , 1, 'CCF'        ),
-            # 4x
-            (LD_40    , 1, 'LD B,B'     ),(LD_41    , 1, 'LD B,C'     ),(LD_42    , 1, 'LD B,D'     ),(LD_43    , 1, 'LD B,E'     ),
-            (LD_44    , 1, 'LD B,H'     ),(LD_45    , 1, 'LD B,L'     ),(LD_46    , 1, 'LD B,(HL)'  ),(LD_47    , 1, 'LD B,A'     ),
-            (LD_48    , 1, 'LD C,B'     ),(LD_49    , 1, 'LD C,C'     ),(LD_4A    , 1, 'LD C,D'     ),(LD_4B    , 1, 'LD C,E'     ),
-            (LD_4C    , 1, 'LD C,H'     ),(LD_4D    , 1, 'LD C,L'     ),(LD_4E    , 1, 'LD C,(HL)'  ),(LD_4F    , 1, 'LD C,A'     ),
-            # 5x
-            (LD_50    , 1, 'LD D,B'     ),(LD_51    , 1, 'LD D,C'     ),(LD_52    , 1, 'LD D,D'     ),(LD_53    , 1, 'LD D,E'     ),
-            (LD_54    , 1, 'LD D,H'     ),(LD_55    , 1, 'LD D,L'     ),(LD_56    , 1, 'LD D,(HL)'  ),(LD_57    , 1, 'LD D,A'     ),
-            (LD_58    , 1, 'LD E,B'     ),(LD_59    , 1, 'LD E,C'     ),(LD_5A    , 1, 'LD E,D'     ),(LD_5B    , 1, 'LD E,E'     ),
-            (LD_5C    , 1, 'LD E,H'     ),(LD_5D    , 1, 'LD E,L'     ),(LD_5E    , 1, 'LD E,(HL)'  ),(LD_5F    , 1, 'LD E,A'     ),
-            # 6x
-            (LD_60    , 1, 'LD H,B'     ),(LD_61    , 1, 'LD H,C'     ),(LD_62    , 1, 'LD H,D'     ),(LD_63    , 1, 'LD H,E'     ),
-            (LD_64    , 1, 'LD H,H'     ),(LD_65    , 1, 'LD H,L'     ),(LD_66    , 1, 'LD H,(HL)'  ),(LD_67    , 1, 'LD H,A'     ),
-            (LD_68    , 1, 'LD L,B'     ),(LD_69    , 1, 'LD L,C'     ),(LD_6A    , 1, 'LD L,D'     ),(LD_6B    , 1, 'LD L,E'     ),
-            (LD_6C    , 1, 'LD L,H'     ),(LD_6D    , 1, 'LD L,L'     ),(LD_6E    , 1, 'LD L,(HL)'  ),(LD_6F    , 1, 'LD L,A'     ),
-            # 7x
-            (LD_70    , 1, 'LD (HL),B'  ),(LD_71    , 1, 'LD (HL),C'  ),(LD_72    , 1, 'LD (HL),D'  ),(LD_73    , 1, 'LD (HL),E'  ),
-            (LD_74    , 1, 'LD (HL),H'  ),(LD_75    , 1, 'LD (HL),L'  ),(HALT_76  , 1, 'HALT'       ),(LD_77    , 1, 'LD (HL),A'  ),
-            (LD_78    , 1, 'LD A,B'     ),(LD_79    , 1, 'LD A,C'     ),(LD_7A    , 1, 'LD A,D'     ),(LD_7B    , 1, 'LD A,E'     ),
-            (LD_7C    , 1, 'LD A,H'     ),(LD_7D    , 1, 'LD A,L'     ),(LD_7E    , 1, 'LD A,(HL)'  ),(LD_7F    , 1, 'LD A,A'     ),
-            # 8x
-            (ADD_80   , 1, 'ADD A,B'    ),(ADD_81   , 1, 'ADD A,C'    ),(ADD_82   , 1, 'ADD A,D'    ),(ADD_83   , 1, 'ADD A,E'    ),
-            (ADD_84   , 1, 'ADD A,H'    ),(ADD_85   , 1, 'ADD A,L'    ),(ADD_86   , 1, 'ADD A,(HL)' ),(ADD_87   , 1, 'ADD A,A'    ),
-            (ADC_88   , 1, 'ADC A,B'    ),(ADC_89   , 1, 'ADC A,C'    ),(ADC_8A   , 1, 'ADC A,D'    ),(ADC_8B   , 1, 'ADC A,E'    ),
-            (ADC_8C   , 1, 'ADC A,H'    ),(ADC_8D   , 1, 'ADC A,L'    ),(ADC_8E   , 1, 'ADC A,(HL)' ),(ADC_8F   , 1, 'ADC A,A'    ),
-            # 9x
-            (SUB_90   , 1, 'SUB B'      ),(SUB_91   , 1, 'SUB C'      ),(SUB_92   , 1, 'SUB D'      ),(SUB_93   , 1, 'SUB E'      ),
-            (SUB_94   , 1, 'SUB H'      ),(SUB_95   , 1, 'SUB L'      ),(SUB_96   , 1, 'SUB (HL)'   ),(SUB_97   , 1, 'SUB A'      ),
-            (SBC_98   , 1, 'SBC A,B'    ),(SBC_99   , 1, 'SBC A,C'    ),(SBC_9A   , 1, 'SBC A,D'    ),(SBC_9B   , 1, 'SBC A,E'    ),
-            (SBC_9C   , 1, 'SBC A,H'    ),(SBC_9D   , 1, 'SBC A,L'    ),(SBC_9E   , 1, 'SBC A,(HL)' ),(SBC_9F   , 1, 'SBC A,A'    ),
-            # Ax
-            (AND_A0   , 1, 'AND B'      ),(AND_A1   , 1, 'AND C'      ),(AND_A2   , 1, 'AND D'      ),(AND_A3   , 1, 'AND E'      ),
-            (AND_A4   , 1, 'AND H'      ),(AND_A5   , 1, 'AND L'      ),(AND_A6   , 1, 'AND (HL)'   ),(AND_A7   , 1, 'AND A'      ),
-            (XOR_A8   , 1, 'XOR B'      ),(XOR_A9   , 1, 'XOR C'      ),(XOR_AA   , 1, 'XOR D'      ),(XOR_AB   , 1, 'XOR E'      ),
-            (XOR_AC   , 1, 'XOR H'      ),(XOR_AD   , 1, 'XOR L'      ),(XOR_AE   , 1, 'XOR (HL)'   ),(XOR_AF   , 1, 'XOR A'      ),
-            # Bx
-            (OR_B0    , 1, 'OR B'       ),(OR_B1    , 1, 'OR C'       ),(OR_B2    , 1, 'OR D'       ),(OR_B3    , 1, 'OR E'       ),
-            (OR_B4    , 1, 'OR H'       ),(OR_B5    , 1, 'OR L'       ),(OR_B6    , 1, 'OR (HL)'    ),(OR_B7    , 1, 'OR A'       ),
-            (CP_B8    , 1, 'CP B'       ),(CP_B9    , 1, 'CP C'       ),(CP_BA    , 1, 'CP D'       ),(CP_BB    , 1, 'CP E'       ),
-            (CP_BC    , 1, 'CP H'       ),(CP_BD    , 1, 'CP L'       ),(CP_BE    , 1, 'CP (HL)'    ),(CP_BF    , 1, 'CP A'       ),
-            # Cx
-            (RET_C0   , 1, 'RET NZ'     ),(POP_C1   , 1, 'POP BC'     ),(JP_C2    , 3, 'JP NZ,a16'  ),(JP_C3    , 3, 'JP a16'     ),
-            (CALL_C4  , 3, 'CALL NZ,a16'),(PUSH_C5  , 1, 'PUSH BC'    ),(ADD_C6   , 2, 'ADD A,d8'   ),(RST_C7   , 1, 'RST 00H'    ),
-            (RET_C8   , 1, 'RET Z'      ),(RET_C9   , 1, 'RET'        ),(JP_CA    , 3, 'JP Z,a16'   ),(PREFIX_CB, 1, 'PREFIX CB'  ),
-            (CALL_CC  , 3, 'CALL Z,a16' ),(CALL_CD  , 3, 'CALL a16'   ),(ADC_CE   , 2, 'ADC A,d8'   ),(RST_CF   , 1, 'RST 08H'    ),
-            # Dx
-            (RET_D0   , 1, 'RET NC'     ),(POP_D1   , 1, 'POP DE'     ),(JP_D2    , 3, 'JP NC,a16'  ),(NULL     , 0, ''           ),
-            (CALL_D4  , 3, 'CALL NC,a16'),(PUSH_D5  , 1, 'PUSH DE'    ),(SUB_D6   , 2, 'SUB d8'     ),(RST_D7   , 1, 'RST 10H'    ),
-            (RET_D8   , 1, 'RET C'      ),(RETI_D9  , 1, 'RETI'       ),(JP_DA    , 3, 'JP C,a16'   ),(NULL     , 0, ''           ),
-            (CALL_DC  , 3, 'CALL C,a16' ),(NULL     , 0, ''           ),(SBC_DE   , 2, 'SBC A,d8'   ),(RST_DF   , 1, 'RST 18H'    ),
-            # Ex
-            (LDH_E0   , 2, 'LDH (a8),A' ),(POP_E1   , 1, 'POP HL'     ),(LD_E2    , 1, 'LD (C),A'   ),(NULL     , 0, ''           ),
-            (NULL     , 0, ''           ),(PUSH_E5  , 1, 'PUSH HL'    ),(AND_E6   , 2, 'AND d8'     ),(RST_E7   , 1, 'RST 20H'    ),
-            (ADD_E8   , 2, 'ADD SP,r8'  ),(JP_E9    , 1, 'JP (HL)'    ),(LD_EA    , 3, 'LD (a16),A' ),(NULL     , 0, ''           ),
-            (NULL     , 0, ''           ),(NULL     , 0, ''           ),(XOR_EE   , 2, 'XOR d8'     ),(RST_EF   , 1, 'RST 28H'    ),
-            # Fx
-            (LDH_F0   , 2, 'LDH A,(a8)' ),(POP_F1   , 1, 'POP AF'     ),(LD_F2    , 1, 'LD A,(C)'   ),(DI_F3    , 1, 'DI'         ),
-            (NULL     , 0, ''           ),(PUSH_F5  , 1, 'PUSH AF'    ),(OR_F6    , 2, 'OR d8'      ),(RST_F7   , 1, 'RST 30H'    ),
-            (LD_F8    , 2, 'LD HL,SP+r8'),(LD_F9    , 1, 'LD SP,HL'   ),(LD_FA    , 3, 'LD A,(a16)' ),(EI_FB    , 1, 'EI'         ),
-            (NULL     , 0, ''           ),(NULL     , 0, ''           ),(CP_FE    , 2, 'CP d8'      ),(RST_FF   , 1, 'RST 38H'    ),
-            # 10x
-            (RLC_100  , 2, 'RLC B'      ),(RLC_101  , 2, 'RLC C'      ),(RLC_102  , 2, 'RLC D'      ),(RLC_103  , 2, 'RLC E'      ),
-            (RLC_104  , 2, 'RLC H'      ),(RLC_105  , 2, 'RLC L'      ),(RLC_106  , 2, 'RLC (HL)'   ),(RLC_107  , 2, 'RLC A'      ),
-            (RRC_108  , 2, 'RRC B'      ),(RRC_109  , 2, 'RRC C'      ),(RRC_10A  , 2, 'RRC D'      ),(RRC_10B  , 2, 'RRC E'      ),
-            (RRC_10C  , 2, 'RRC H'      ),(RRC_10D  , 2, 'RRC L'      ),(RRC_10E  , 2, 'RRC (HL)'   ),(RRC_10F  , 2, 'RRC A'      ),
-            # 11x
-            (RL_110   , 2, 'RL B'       ),(RL_111   , 2, 'RL C'       ),(RL_112   , 2, 'RL D'       ),(RL_113   , 2, 'RL E'       ),
-            (RL_114   , 2, 'RL H'       ),(RL_115   , 2, 'RL L'       ),(RL_116   , 2, 'RL (HL)'    ),(RL_117   , 2, 'RL A'       ),
-            (RR_118   , 2, 'RR B'       ),(RR_119   , 2, 'RR C'       ),(RR_11A   , 2, 'RR D'       ),(RR_11B   , 2, 'RR E'       ),
-            (RR_11C   , 2, 'RR H'       ),(RR_11D   , 2, 'RR L'       ),(RR_11E   , 2, 'RR (HL)'    ),(RR_11F   , 2, 'RR A'       ),
-            # 12x
-            (SLA_120  , 2, 'SLA B'      ),(SLA_121  , 2, 'SLA C'      ),(SLA_122  , 2, 'SLA D'      ),(SLA_123  , 2, 'SLA E'      ),
-            (SLA_124  , 2, 'SLA H'      ),(SLA_125  , 2, 'SLA L'      ),(SLA_126  , 2, 'SLA (HL)'   ),(SLA_127  , 2, 'SLA A'      ),
-            (SRA_128  , 2, 'SRA B'      ),(SRA_129  , 2, 'SRA C'      ),(SRA_12A  , 2, 'SRA D'      ),(SRA_12B  , 2, 'SRA E'      ),
-            (SRA_12C  , 2, 'SRA H'      ),(SRA_12D  , 2, 'SRA L'      ),(SRA_12E  , 2, 'SRA (HL)'   ),(SRA_12F  , 2, 'SRA A'      ),
-            # 13x
-            (SWAP_130 , 2, 'SWAP B'     ),(SWAP_131 , 2, 'SWAP C'     ),(SWAP_132 , 2, 'SWAP D'     ),(SWAP_133 , 2, 'SWAP E'     ),
-            (SWAP_134 , 2, 'SWAP H'     ),(SWAP_135 , 2, 'SWAP L'     ),(SWAP_136 , 2, 'SWAP (HL)'  ),(SWAP_137 , 2, 'SWAP A'     ),
-            (SRL_138  , 2, 'SRL B'      ),(SRL_139  , 2, 'SRL C'      ),(SRL_13A  , 2, 'SRL D'      ),(SRL_13B  , 2, 'SRL E'      ),
-            (SRL_13C  , 2, 'SRL H'      ),(SRL_13D  , 2, 'SRL L'      ),(SRL_13E  , 2, 'SRL (HL)'   ),(SRL_13F  , 2, 'SRL A'      ),
-            # 14x
-            (BIT_140  , 2, 'BIT 0,B'    ),(BIT_141  , 2, 'BIT 0,C'    ),(BIT_142  , 2, 'BIT 0,D'    ),(BIT_143  , 2, 'BIT 0,E'    ),
-            (BIT_144  , 2, 'BIT 0,H'    ),(BIT_145  , 2, 'BIT 0,L'    ),(BIT_146  , 2, 'BIT 0,(HL)' ),(BIT_147  , 2, 'BIT 0,A'    ),
-            (BIT_148  , 2, 'BIT 1,B'    ),(BIT_149  , 2, 'BIT 1,C'    ),(BIT_14A  , 2, 'BIT 1,D'    ),(BIT_14B  , 2, 'BIT 1,E'    ),
-            (BIT_14C  , 2, 'BIT 1,H'    ),(BIT_14D  , 2, 'BIT 1,L'    ),(BIT_14E  , 2, 'BIT 1,(HL)' ),(BIT_14F  , 2, 'BIT 1,A'    ),
-            # 15x
-            (BIT_150  , 2, 'BIT 2,B'    ),(BIT_151  , 2, 'BIT 2,C'    ),(BIT_152  , 2, 'BIT 2,D'    ),(BIT_153  , 2, 'BIT 2,E'    ),
-            (BIT_154  , 2, 'BIT 2,H'    ),(BIT_155  , 2, 'BIT 2,L'    ),(BIT_156  , 2, 'BIT 2,(HL)' ),(BIT_157  , 2, 'BIT 2,A'    ),
-            (BIT_158  , 2, 'BIT 3,B'    ),(BIT_159  , 2, 'BIT 3,C'    ),(BIT_15A  , 2, 'BIT 3,D'    ),(BIT_15B  , 2, 'BIT 3,E'    ),
-            (BIT_15C  , 2, 'BIT 3,H'    ),(BIT_15D  , 2, 'BIT 3,L'    ),(BIT_15E  , 2, 'BIT 3,(HL)' ),(BIT_15F  , 2, 'BIT 3,A'    ),
-            # 16x
-            (BIT_160  , 2, 'BIT 4,B'    ),(BIT_161  , 2, 'BIT 4,C'    ),(BIT_162  , 2, 'BIT 4,D'    ),(BIT_163  , 2, 'BIT 4,E'    ),
-            (BIT_164  , 2, 'BIT 4,H'    ),(BIT_165  , 2, 'BIT 4,L'    ),(BIT_166  , 2, 'BIT 4,(HL)' ),(BIT_167  , 2, 'BIT 4,A'    ),
-            (BIT_168  , 2, 'BIT 5,B'    ),(BIT_169  , 2, 'BIT 5,C'    ),(BIT_16A  , 2, 'BIT 5,D'    ),(BIT_16B  , 2, 'BIT 5,E'    ),
-            (BIT_16C  , 2, 'BIT 5,H'    ),(BIT_16D  , 2, 'BIT 5,L'    ),(BIT_16E  , 2, 'BIT 5,(HL)' ),(BIT_16F  , 2, 'BIT 5,A'    ),
-            # 17x
-            (BIT_170  , 2, 'BIT 6,B'    ),(BIT_171  , 2, 'BIT 6,C'    ),(BIT_172  , 2, 'BIT 6,D'    ),(BIT_173  , 2, 'BIT 6,E'    ),
-            (BIT_174  , 2, 'BIT 6,H'    ),(BIT_175  , 2, 'BIT 6,L'    ),(BIT_176  , 2, 'BIT 6,(HL)' ),(BIT_177  , 2, 'BIT 6,A'    ),
-            (BIT_178  , 2, 'BIT 7,B'    ),(BIT_179  , 2, 'BIT 7,C'    ),(BIT_17A  , 2, 'BIT 7,D'    ),(BIT_17B  , 2, 'BIT 7,E'    ),
-            (BIT_17C  , 2, 'BIT 7,H'    ),(BIT_17D  , 2, 'BIT 7,L'    ),(BIT_17E  , 2, 'BIT 7,(HL)' ),(BIT_17F  , 2, 'BIT 7,A'    ),
-            # 18x
-            (RES_180  , 2, 'RES 0,B'    ),(RES_181  , 2, 'RES 0,C'    ),(RES_182  , 2, 'RES 0,D'    ),(RES_183  , 2, 'RES 0,E'    ),
-            (RES_184  , 2, 'RES 0,H'    ),(RES_185  , 2, 'RES 0,L'    ),(RES_186  , 2, 'RES 0,(HL)' ),(RES_187  , 2, 'RES 0,A'    ),
-            (RES_188  , 2, 'RES 1,B'    ),(RES_189  , 2, 'RES 1,C'    ),(RES_18A  , 2, 'RES 1,D'    ),(RES_18B  , 2, 'RES 1,E'    ),
-            (RES_18C  , 2, 'RES 1,H'    ),(RES_18D  , 2, 'RES 1,L'    ),(RES_18E  , 2, 'RES 1,(HL)' ),(RES_18F  , 2, 'RES 1,A'    ),
-            # 19x
-            (RES_190  , 2, 'RES 2,B'    ),(RES_191  , 2, 'RES 2,C'    ),(RES_192  , 2, 'RES 2,D'    ),(RES_193  , 2, 'RES 2,E'    ),
-            (RES_194  , 2, 'RES 2,H'    ),(RES_195  , 2, 'RES 2,L'    ),(RES_196  , 2, 'RES 2,(HL)' ),(RES_197  , 2, 'RES 2,A'    ),
-            (RES_198  , 2, 'RES 3,B'    ),(RES_199  , 2, 'RES 3,C'    ),(RES_19A  , 2, 'RES 3,D'    ),(RES_19B  , 2, 'RES 3,E'    ),
-            (RES_19C  , 2, 'RES 3,H'    ),(RES_19D  , 2, 'RES 3,L'    ),(RES_19E  , 2, 'RES 3,(HL)' ),(RES_19F  , 2, 'RES 3,A'    ),
-            # 1Ax
-            (RES_1A0  , 2, 'RES 4,B'    ),(RES_1A1  , 2, 'RES 4,C'    ),(RES_1A2  , 2, 'RES 4,D'    ),(RES_1A3  , 2, 'RES 4,E'    ),
-            (RES_1A4  , 2, 'RES 4,H'    ),(RES_1A5  , 2, 'RES 4,L'    ),(RES_1A6  , 2, 'RES 4,(HL)' ),(RES_1A7  , 2, 'RES 4,A'    ),
-            (RES_1A8  , 2, 'RES 5,B'    ),(RES_1A9  , 2, 'RES 5,C'    ),(RES_1AA  , 2, 'RES 5,D'    ),(RES_1AB  , 2, 'RES 5,E'    ),
-            (RES_1AC  , 2, 'RES 5,H'    ),(RES_1AD  , 2, 'RES 5,L'    ),(RES_1AE  , 2, 'RES 5,(HL)' ),(RES_1AF  , 2, 'RES 5,A'    ),
-            # 1Bx
-            (RES_1B0  , 2, 'RES 6,B'    ),(RES_1B1  , 2, 'RES 6,C'    ),(RES_1B2  , 2, 'RES 6,D'    ),(RES_1B3  , 2, 'RES 6,E'    ),
-            (RES_1B4  , 2, 'RES 6,H'    ),(RES_1B5  , 2, 'RES 6,L'    ),(RES_1B6  , 2, 'RES 6,(HL)' ),(RES_1B7  , 2, 'RES 6,A'    ),
-            (RES_1B8  , 2, 'RES 7,B'    ),(RES_1B9  , 2, 'RES 7,C'    ),(RES_1BA  , 2, 'RES 7,D'    ),(RES_1BB  , 2, 'RES 7,E'    ),
-            (RES_1BC  , 2, 'RES 7,H'    ),(RES_1BD  , 2, 'RES 7,L'    ),(RES_1BE  , 2, 'RES 7,(HL)' ),(RES_1BF  , 2, 'RES 7,A'    ),
-            # 1Cx
-            (SET_1C0  , 2, 'SET 0,B'    ),(SET_1C1  , 2, 'SET 0,C'    ),(SET_1C2  , 2, 'SET 0,D'    ),(SET_1C3  , 2, 'SET 0,E'    ),
-            (SET_1C4  , 2, 'SET 0,H'    ),(SET_1C5  , 2, 'SET 0,L'    ),(SET_1C6  , 2, 'SET 0,(HL)' ),(SET_1C7  , 2, 'SET 0,A'    ),
-            (SET_1C8  , 2, 'SET 1,B'    ),(SET_1C9  , 2, 'SET 1,C'    ),(SET_1CA  , 2, 'SET 1,D'    ),(SET_1CB  , 2, 'SET 1,E'    ),
-            (SET_1CC  , 2, 'SET 1,H'    ),(SET_1CD  , 2, 'SET 1,L'    ),(SET_1CE  , 2, 'SET 1,(HL)' ),(SET_1CF  , 2, 'SET 1,A'    ),
-            # 1Dx
-            (SET_1D0  , 2, 'SET 2,B'    ),(SET_1D1  , 2, 'SET 2,C'    ),(SET_1D2  , 2, 'SET 2,D'    ),(SET_1D3  , 2, 'SET 2,E'    ),
-            (SET_1D4  , 2, 'SET 2,H'    ),(SET_1D5  , 2, 'SET 2,L'    ),(SET_1D6  , 2, 'SET 2,(HL)' ),(SET_1D7  , 2, 'SET 2,A'    ),
-            (SET_1D8  , 2, 'SET 3,B'    ),(SET_1D9  , 2, 'SET 3,C'    ),(SET_1DA  , 2, 'SET 3,D'    ),(SET_1DB  , 2, 'SET 3,E'    ),
-            (SET_1DC  , 2, 'SET 3,H'    ),(SET_1DD  , 2, 'SET 3,L'    ),(SET_1DE  , 2, 'SET 3,(HL)' ),(SET_1DF  , 2, 'SET 3,A'    ),
-            # 1Ex
-            (SET_1E0  , 2, 'SET 4,B'    ),(SET_1E1  , 2, 'SET 4,C'    ),(SET_1E2  , 2, 'SET 4,D'    ),(SET_1E3  , 2, 'SET 4,E'    ),
-            (SET_1E4  , 2, 'SET 4,H'    ),(SET_1E5  , 2, 'SET 4,L'    ),(SET_1E6  , 2, 'SET 4,(HL)' ),(SET_1E7  , 2, 'SET 4,A'    ),
-            (SET_1E8  , 2, 'SET 5,B'    ),(SET_1E9  , 2, 'SET 5,C'    ),(SET_1EA  , 2, 'SET 5,D'    ),(SET_1EB  , 2, 'SET 5,E'    ),
-            (SET_1EC  , 2, 'SET 5,H'    ),(SET_1ED  , 2, 'SET 5,L'    ),(SET_1EE  , 2, 'SET 5,(HL)' ),(SET_1EF  , 2, 'SET 5,A'    ),
-            # 1Fx
-            (SET_1F0  , 2, 'SET 6,B'    ),(SET_1F1  , 2, 'SET 6,C'    ),(SET_1F2  , 2, 'SET 6,D'    ),(SET_1F3  , 2, 'SET 6,E'    ),
-            (SET_1F4  , 2, 'SET 6,H'    ),(SET_1F5  , 2, 'SET 6,L'    ),(SET_1F6  , 2, 'SET 6,(HL)' ),(SET_1F7  , 2, 'SET 6,A'    ),
-            (SET_1F8  , 2, 'SET 7,B'    ),(SET_1F9  , 2, 'SET 7,C'    ),(SET_1FA  , 2, 'SET 7,D'    ),(SET_1FB  , 2, 'SET 7,E'    ),
-            (SET_1FC  , 2, 'SET 7,H'    ),(SET_1FD  , 2, 'SET 7,L'    ),(SET_1FE  , 2, 'SET 7,(HL)' ),(SET_1FF  , 2, 'SET 7,A'    )
-        ]
     
     @property
     def Fc(self) -> bool: return bool((self.F >> FLAG_C) & 1)
@@ -254,7 +98,7 @@ class Z80(object):
 
         # decode
         try:
-            opfunc, oplen, self.opname = self.OP_MAP[self.opcode]
+            opfunc, oplen, self.opname = OP_MAP[self.opcode]
             for i in range(oplen - 1):
                 self.args[i] = self.emu.read(self.PC + 1 + i)
         except IndexError:
@@ -267,42 +111,53 @@ class Z80(object):
         self.PC &= 0xFFFF
         return cyclesPassed
     
+    def snapshot(self) -> tuple:
+        return (
+            self.A, self.B, self.C, self.D, self.E, self.F, self.H, self.L, self.PC, self.SP,
+            self.halted, self.interruptable, self.intrPending
+        )
+
+    def restore(self, state: tuple) -> None:
+        (
+            self.A, self.B, self.C, self.D, self.E, self.F, self.H, self.L, self.PC, self.SP,
+            self.halted, self.interruptable, self.intrPending
+        ) = state
+
     def setInterrupt(self, flag: int) -> None:
-        self.emu.write(IF_ADDR, self.emu.read(IF_ADDR) | (1 << flag))
+        # raised by the hardware, IF is written directly so that only the program goes through mmu
+        self.emu.mmu.bytes[IF_ADDR] |= 1 << flag
+        self.updateInterrupt()
+    
+    def updateInterrupt(self) -> None:
+        # called whenever IF, IE, IME or halted changes, the registers are read directly
+        # so that only accesses of the program go through mmu
+        mem = self.emu.mmu.bytes
+        pending = mem[IF_ADDR] & mem[IE_ADDR] & 0x1F
+        self.intrPending = bool(pending) and (self.interruptable or self.halted)
     
     def handleInterrupted(self) -> int:
-        IF, IE = self.emu.read(IF_ADDR), self.emu.read(IE_ADDR)
-        pending = IF & IE
-        for flag in range(5):
-            if (pending >> flag) & 1:
-                # clear interrupt flag
-                self.emu.write(IF_ADDR, setBit(IF, flag, 0))
-                break
-        else:
-            return 0
-        
-        self.interruptable = False
-        self.halted = False
-        self.push(self.PC >> 8) # high addr
-        self.push(self.PC & 0xFF) # low addr
-        if flag == IF_VBLANK:
-            self.PC = 0x40
-        elif flag == IF_STAT:
-            self.PC = 0x48
-        elif flag == IF_TIMER:
-            self.PC = 0x50
-        elif flag == IF_SERIAL:
-            self.PC = 0x58
-        elif flag == IF_JOYPAD:
-            self.PC = 0x60
-        return 20
+        mem = self.emu.mmu.bytes
+        IF = mem[IF_ADDR]
+        flag, vector = INTR_TABLE[IF & mem[IE_ADDR] & 0x1F]
+        ticks = 0
+        if self.halted:
+            # any enabled interrupt wakes the cpu up, even if IME is reset
+            self.halted = False
+            ticks += 4
+        if self.interruptable and flag >= 0:
+            self.interruptable = False
+            # clear interrupt flag, refreshed by updateInterrupt below
+            mem[IF_ADDR] = setBit(IF, flag, 0)
+            self.push(self.PC >> 8) # high addr
+            self.push(self.PC & 0xFF) # low addr
+            self.PC = vector
+            ticks += 20
+        self.updateInterrupt()
+        return ticks
     
     def step(self) -> int:
         ticks = 0
-        if self.halted and self.pendingIntr != self.emu.read(IF_ADDR):
-            ticks += 4
-            self.halted = False
-        if self.interruptable or self.pendingIntr:
+        if self.intrPending:
             ticks += self.handleInterrupted()
         if self.halted:
             ticks += 4
@@ -1231,7 +1086,7 @@ def LD_75(z80: Z80) -> int:
 # - - - -
 def HALT_76(z80: Z80) -> int:
     z80.halted = True
-    z80.pendingIntr = z80.emu.read(IF_ADDR)
+    z80.updateInterrupt()
     return 4
 
 # 0x77 : LD (HL), A
@@ -2026,6 +1881,7 @@ def RETI_D9(z80: Z80) -> int:
     addrHi = z80.pop()
     z80.PC = (addrHi << 8) | addrLo
     z80.interruptable = True
+    z80.updateInterrupt()
     return 16
 
 # 0xDA : JP C, a16
@@ -2212,6 +2068,7 @@ def LD_F2(z80: Z80) -> int:
 # - - - -
 def DI_F3(z80: Z80) -> int:
     z80.interruptable = False
+    z80.updateInterrupt()
     return 4
 
 # 0xF4 : NULL
@@ -2281,6 +2138,7 @@ def LD_FA(z80: Z80) -> int:
 # - - - -
 def EI_FB(z80: Z80) -> int:
     z80.interruptable = True
+    z80.updateInterrupt()
     return 4
 
 # 0xFC : NULL
@@ -3963,3 +3821,167 @@ def SET_1FE(z80: Z80) -> int:
 def SET_1FF(z80: Z80) -> int:
     z80.A &= (1 << 7)
     return 8
+
+# dispatch table shared by all instances (0x100 ~ 0x1FF for the CB prefixed ones)
+OP_MAP = (
+    # 0x
+    (NOP_00   , 1, 'NOP'        ),(LD_01    , 3, 'LD BC,d16'  ),(LD_02    , 1, 'LD (BC),A'  ),(INC_03   , 1, 'INC BC'     ),
+    (INC_04   , 1, 'INC B'      ),(DEC_05   , 1, 'DEC B'      ),(LD_06    , 2, 'LD B,d8'    ),(RLCA_07  , 1, 'RLCA'       ),
+    (LD_08    , 3, 'LD (a16),SP'),(ADD_09   , 1, 'ADD HL,BC'  ),(LD_0A    , 1, 'LD A,(BC)'  ),(DEC_0B   , 1, 'DEC BC'     ),
+    (INC_0C   , 1, 'INC C'      ),(DEC_0D   , 1, 'DEC C'      ),(LD_0E    , 2, 'LD C,d8'    ),(RRCA_0F  , 1, 'RRCA'       ),
+    # 1x
+    (STOP_10  , 2, 'STOP 0'     ),(LD_11    , 3, 'LD DE,d16'  ),(LD_12    , 1, 'LD (DE),A'  ),(INC_13   , 1, 'INC DE'     ),
+    (INC_14   , 1, 'INC D'      ),(DEC_15   , 1, 'DEC D'      ),(LD_16    , 2, 'LD D,d8'    ),(RLA_17   , 1, 'RLA'        ),
+    (JR_18    , 2, 'JR r8'      ),(ADD_19   , 1, 'ADD HL,DE'  ),(LD_1A    , 1, 'LD A,(DE)'  ),(DEC_1B   , 1, 'DEC DE'     ),
+    (INC_1C   , 1, 'INC E'      ),(DEC_1D   , 1, 'DEC E'      ),(LD_1E    , 2, 'LD E,d8'    ),(RRA_1F   , 1, 'RRA'        ),
+    # 2x
+    (JR_20    , 2, 'JR NZ,r8'   ),(LD_21    , 3, 'LD HL,d16'  ),(LD_22    , 1, 'LD (HL+),A' ),(INC_23   , 1, 'INC HL'     ),
+    (INC_24   , 1, 'INC H'      ),(DEC_25   , 1, 'DEC H'      ),(LD_26    , 2, 'LD H,d8'    ),(DAA_27   , 1, 'DAA'        ),
+    (JR_28    , 2, 'JR Z,r8'    ),(ADD_29   , 1, 'ADD HL,HL'  ),(LD_2A    , 1, 'LD A,(HL+)' ),(DEC_2B   , 1, 'DEC HL'     ),
+    (INC_2C   , 1, 'INC L'      ),(DEC_2D   , 1, 'DEC L'      ),(LD_2E    , 2, 'LD L,d8'    ),(CPL_2F   , 1, 'CPL'        ),
+    # 3x
+    (JR_30    , 2, 'JR NC,r8'   ),(LD_31    , 3, 'LD SP,d16'  ),(LD_32    , 1, 'LD (HL-),A' ),(INC_33   , 1, 'INC SP'     ),
+    (INC_34   , 1, 'INC (HL)'   ),(DEC_35   , 1, 'DEC (HL)'   ),(LD_36    , 2, 'LD (HL),d8' ),(SCF_37   , 1, 'SCF'        ),
+    (JR_38    , 2, 'JR C,r8'    ),(ADD_39   , 1, 'ADD HL,SP'  ),(LD_3A    , 1, 'LD A,(HL-)' ),(DEC_3B   , 1, 'DEC SP'     ),
+    (INC_3C   , 1, 'INC A'      ),(DEC_3D   , 1, 'DEC A'      ),(LD_3E    , 2, 'LD A,d8'    ),(CCF_3F   , 1, 'CCF'        ),
+    # 4x
+    (LD_40    , 1, 'LD B,B'     ),(LD_41    , 1, 'LD B,C'     ),(LD_42    , 1, 'LD B,D'     ),(LD_43    , 1, 'LD B,E'     ),
+    (LD_44    , 1, 'LD B,H'     ),(LD_45    , 1, 'LD B,L'     ),(LD_46    , 1, 'LD B,(HL)'  ),(LD_47    , 1, 'LD B,A'     ),
+    (LD_48    , 1, 'LD C,B'     ),(LD_49    , 1, 'LD C,C'     ),(LD_4A    , 1, 'LD C,D'     ),(LD_4B    , 1, 'LD C,E'     ),
+    (LD_4C    , 1, 'LD C,H'     ),(LD_4D    , 1, 'LD C,L'     ),(LD_4E    , 1, 'LD C,(HL)'  ),(LD_4F    , 1, 'LD C,A'     ),
+    # 5x
+    (LD_50    , 1, 'LD D,B'     ),(LD_51    , 1, 'LD D,C'     ),(LD_52    , 1, 'LD D,D'     ),(LD_53    , 1, 'LD D,E'     ),
+    (LD_54    , 1, 'LD D,H'     ),(LD_55    , 1, 'LD D,L'     ),(LD_56    , 1, 'LD D,(HL)'  ),(LD_57    , 1, 'LD D,A'     ),
+    (LD_58    , 1, 'LD E,B'     ),(LD_59    , 1, 'LD E,C'     ),(LD_5A    , 1, 'LD E,D'     ),(LD_5B    , 1, 'LD E,E'     ),
+    (LD_5C    , 1, 'LD E,H'     ),(LD_5D    , 1, 'LD E,L'     ),(LD_5E    , 1, 'LD E,(HL)'  ),(LD_5F    , 1, 'LD E,A'     ),
+    # 6x
+    (LD_60    , 1, 'LD H,B'     ),(LD_61    , 1, 'LD H,C'     ),(LD_62    , 1, 'LD H,D'     ),(LD_63    , 1, 'LD H,E'     ),
+    (LD_64    , 1, 'LD H,H'     ),(LD_65    , 1, 'LD H,L'     ),(LD_66    , 1, 'LD H,(HL)'  ),(LD_67    , 1, 'LD H,A'     ),
+    (LD_68    , 1, 'LD L,B'     ),(LD_69    , 1, 'LD L,C'     ),(LD_6A    , 1, 'LD L,D'     ),(LD_6B    , 1, 'LD L,E'     ),
+    (LD_6C    , 1, 'LD L,H'     ),(LD_6D    , 1, 'LD L,L'     ),(LD_6E    , 1, 'LD L,(HL)'  ),(LD_6F    , 1, 'LD L,A'     ),
+    # 7x
+    (LD_70    , 1, 'LD (HL),B'  ),(LD_71    , 1, 'LD (HL),C'  ),(LD_72    , 1, 'LD (HL),D'  ),(LD_73    , 1, 'LD (HL),E'  ),
+    (LD_74    , 1, 'LD (HL),H'  ),(LD_75    , 1, 'LD (HL),L'  ),(HALT_76  , 1, 'HALT'       ),(LD_77    , 1, 'LD (HL),A'  ),
+    (LD_78    , 1, 'LD A,B'     ),(LD_79    , 1, 'LD A,C'     ),(LD_7A    , 1, 'LD A,D'     ),(LD_7B    , 1, 'LD A,E'     ),
+    (LD_7C    , 1, 'LD A,H'     ),(LD_7D    , 1, 'LD A,L'     ),(LD_7E    , 1, 'LD A,(HL)'  ),(LD_7F    , 1, 'LD A,A'     ),
+    # 8x
+    (ADD_80   , 1, 'ADD A,B'    ),(ADD_81   , 1, 'ADD A,C'    ),(ADD_82   , 1, 'ADD A,D'    ),(ADD_83   , 1, 'ADD A,E'    ),
+    (ADD_84   , 1, 'ADD A,H'    ),(ADD_85   , 1, 'ADD A,L'    ),(ADD_86   , 1, 'ADD A,(HL)' ),(ADD_87   , 1, 'ADD A,A'    ),
+    (ADC_88   , 1, 'ADC A,B'    ),(ADC_89   , 1, 'ADC A,C'    ),(ADC_8A   , 1, 'ADC A,D'    ),(ADC_8B   , 1, 'ADC A,E'    ),
+    (ADC_8C   , 1, 'ADC A,H'    ),(ADC_8D   , 1, 'ADC A,L'    ),(ADC_8E   , 1, 'ADC A,(HL)' ),(ADC_8F   , 1, 'ADC A,A'    ),
+    # 9x
+    (SUB_90   , 1, 'SUB B'      ),(SUB_91   , 1, 'SUB C'      ),(SUB_92   , 1, 'SUB D'      ),(SUB_93   , 1, 'SUB E'      ),
+    (SUB_94   , 1, 'SUB H'      ),(SUB_95   , 1, 'SUB L'      ),(SUB_96   , 1, 'SUB (HL)'   ),(SUB_97   , 1, 'SUB A'      ),
+    (SBC_98   , 1, 'SBC A,B'    ),(SBC_99   , 1, 'SBC A,C'    ),(SBC_9A   , 1, 'SBC A,D'    ),(SBC_9B   , 1, 'SBC A,E'    ),
+    (SBC_9C   , 1, 'SBC A,H'    ),(SBC_9D   , 1, 'SBC A,L'    ),(SBC_9E   , 1, 'SBC A,(HL)' ),(SBC_9F   , 1, 'SBC A,A'    ),
+    # Ax
+    (AND_A0   , 1, 'AND B'      ),(AND_A1   , 1, 'AND C'      ),(AND_A2   , 1, 'AND D'      ),(AND_A3   , 1, 'AND E'      ),
+    (AND_A4   , 1, 'AND H'      ),(AND_A5   , 1, 'AND L'      ),(AND_A6   , 1, 'AND (HL)'   ),(AND_A7   , 1, 'AND A'      ),
+    (XOR_A8   , 1, 'XOR B'      ),(XOR_A9   , 1, 'XOR C'      ),(XOR_AA   , 1, 'XOR D'      ),(XOR_AB   , 1, 'XOR E'      ),
+    (XOR_AC   , 1, 'XOR H'      ),(XOR_AD   , 1, 'XOR L'      ),(XOR_AE   , 1, 'XOR (HL)'   ),(XOR_AF   , 1, 'XOR A'      ),
+    # Bx
+    (OR_B0    , 1, 'OR B'       ),(OR_B1    , 1, 'OR C'       ),(OR_B2    , 1, 'OR D'       ),(OR_B3    , 1, 'OR E'       ),
+    (OR_B4    , 1, 'OR H'       ),(OR_B5    , 1, 'OR L'       ),(OR_B6    , 1, 'OR (HL)'    ),(OR_B7    , 1, 'OR A'       ),
+    (CP_B8    , 1, 'CP B'       ),(CP_B9    , 1, 'CP C'       ),(CP_BA    , 1, 'CP D'       ),(CP_BB    , 1, 'CP E'       ),
+    (CP_BC    , 1, 'CP H'       ),(CP_BD    , 1, 'CP L'       ),(CP_BE    , 1, 'CP (HL)'    ),(CP_BF    , 1, 'CP A'       ),
+    # Cx
+    (RET_C0   , 1, 'RET NZ'     ),(POP_C1   , 1, 'POP BC'     ),(JP_C2    , 3, 'JP NZ,a16'  ),(JP_C3    , 3, 'JP a16'     ),
+    (CALL_C4  , 3, 'CALL NZ,a16'),(PUSH_C5  , 1, 'PUSH BC'    ),(ADD_C6   , 2, 'ADD A,d8'   ),(RST_C7   , 1, 'RST 00H'    ),
+    (RET_C8   , 1, 'RET Z'      ),(RET_C9   , 1, 'RET'        ),(JP_CA    , 3, 'JP Z,a16'   ),(PREFIX_CB, 1, 'PREFIX CB'  ),
+    (CALL_CC  , 3, 'CALL Z,a16' ),(CALL_CD  , 3, 'CALL a16'   ),(ADC_CE   , 2, 'ADC A,d8'   ),(RST_CF   , 1, 'RST 08H'    ),
+    # Dx
+    (RET_D0   , 1, 'RET NC'     ),(POP_D1   , 1, 'POP DE'     ),(JP_D2    , 3, 'JP NC,a16'  ),(NULL     , 0, ''           ),
+    (CALL_D4  , 3, 'CALL NC,a16'),(PUSH_D5  , 1, 'PUSH DE'    ),(SUB_D6   , 2, 'SUB d8'     ),(RST_D7   , 1, 'RST 10H'    ),
+    (RET_D8   , 1, 'RET C'      ),(RETI_D9  , 1, 'RETI'       ),(JP_DA    , 3, 'JP C,a16'   ),(NULL     , 0, ''           ),
+    (CALL_DC  , 3, 'CALL C,a16' ),(NULL     , 0, ''           ),(SBC_DE   , 2, 'SBC A,d8'   ),(RST_DF   , 1, 'RST 18H'    ),
+    # Ex
+    (LDH_E0   , 2, 'LDH (a8),A' ),(POP_E1   , 1, 'POP HL'     ),(LD_E2    , 1, 'LD (C),A'   ),(NULL     , 0, ''           ),
+    (NULL     , 0, ''           ),(PUSH_E5  , 1, 'PUSH HL'    ),(AND_E6   , 2, 'AND d8'     ),(RST_E7   , 1, 'RST 20H'    ),
+    (ADD_E8   , 2, 'ADD SP,r8'  ),(JP_E9    , 1, 'JP (HL)'    ),(LD_EA    , 3, 'LD (a16),A' ),(NULL     , 0, ''           ),
+    (NULL     , 0, ''           ),(NULL     , 0, ''           ),(XOR_EE   , 2, 'XOR d8'     ),(RST_EF   , 1, 'RST 28H'    ),
+    # Fx
+    (LDH_F0   , 2, 'LDH A,(a8)' ),(POP_F1   , 1, 'POP AF'     ),(LD_F2    , 1, 'LD A,(C)'   ),(DI_F3    , 1, 'DI'         ),
+    (NULL     , 0, ''           ),(PUSH_F5  , 1, 'PUSH AF'    ),(OR_F6    , 2, 'OR d8'      ),(RST_F7   , 1, 'RST 30H'    ),
+    (LD_F8    , 2, 'LD HL,SP+r8'),(LD_F9    , 1, 'LD SP,HL'   ),(LD_FA    , 3, 'LD A,(a16)' ),(EI_FB    , 1, 'EI'         ),
+    (NULL     , 0, ''           ),(NULL     , 0, ''           ),(CP_FE    , 2, 'CP d8'      ),(RST_FF   , 1, 'RST 38H'    ),
+    # 10x
+    (RLC_100  , 2, 'RLC B'      ),(RLC_101  , 2, 'RLC C'      ),(RLC_102  , 2, 'RLC D'      ),(RLC_103  , 2, 'RLC E'      ),
+    (RLC_104  , 2, 'RLC H'      ),(RLC_105  , 2, 'RLC L'      ),(RLC_106  , 2, 'RLC (HL)'   ),(RLC_107  , 2, 'RLC A'      ),
+    (RRC_108  , 2, 'RRC B'      ),(RRC_109  , 2, 'RRC C'      ),(RRC_10A  , 2, 'RRC D'      ),(RRC_10B  , 2, 'RRC E'      ),
+    (RRC_10C  , 2, 'RRC H'      ),(RRC_10D  , 2, 'RRC L'      ),(RRC_10E  , 2, 'RRC (HL)'   ),(RRC_10F  , 2, 'RRC A'      ),
+    # 11x
+    (RL_110   , 2, 'RL B'       ),(RL_111   , 2, 'RL C'       ),(RL_112   , 2, 'RL D'       ),(RL_113   , 2, 'RL E'       ),
+    (RL_114   , 2, 'RL H'       ),(RL_115   , 2, 'RL L'       ),(RL_116   , 2, 'RL (HL)'    ),(RL_117   , 2, 'RL A'       ),
+    (RR_118   , 2, 'RR B'       ),(RR_119   , 2, 'RR C'       ),(RR_11A   , 2, 'RR D'       ),(RR_11B   , 2, 'RR E'       ),
+    (RR_11C   , 2, 'RR H'       ),(RR_11D   , 2, 'RR L'       ),(RR_11E   , 2, 'RR (HL)'    ),(RR_11F   , 2, 'RR A'       ),
+    # 12x
+    (SLA_120  , 2, 'SLA B'      ),(SLA_121  , 2, 'SLA C'      ),(SLA_122  , 2, 'SLA D'      ),(SLA_123  , 2, 'SLA E'      ),
+    (SLA_124  , 2, 'SLA H'      ),(SLA_125  , 2, 'SLA L'      ),(SLA_126  , 2, 'SLA (HL)'   ),(SLA_127  , 2, 'SLA A'      ),
+    (SRA_128  , 2, 'SRA B'      ),(SRA_129  , 2, 'SRA C'      ),(SRA_12A  , 2, 'SRA D'      ),(SRA_12B  , 2, 'SRA E'      ),
+    (SRA_12C  , 2, 'SRA H'      ),(SRA_12D  , 2, 'SRA L'      ),(SRA_12E  , 2, 'SRA (HL)'   ),(SRA_12F  , 2, 'SRA A'      ),
+    # 13x
+    (SWAP_130 , 2, 'SWAP B'     ),(SWAP_131 , 2, 'SWAP C'     ),(SWAP_132 , 2, 'SWAP D'     ),(SWAP_133 , 2, 'SWAP E'     ),
+    (SWAP_134 , 2, 'SWAP H'     ),(SWAP_135 , 2, 'SWAP L'     ),(SWAP_136 , 2, 'SWAP (HL)'  ),(SWAP_137 , 2, 'SWAP A'     ),
+    (SRL_138  , 2, 'SRL B'      ),(SRL_139  , 2, 'SRL C'      ),(SRL_13A  , 2, 'SRL D'      ),(SRL_13B  , 2, 'SRL E'      ),
+    (SRL_13C  , 2, 'SRL H'      ),(SRL_13D  , 2, 'SRL L'      ),(SRL_13E  , 2, 'SRL (HL)'   ),(SRL_13F  , 2, 'SRL A'      ),
+    # 14x
+    (BIT_140  , 2, 'BIT 0,B'    ),(BIT_141  , 2, 'BIT 0,C'    ),(BIT_142  , 2, 'BIT 0,D'    ),(BIT_143  , 2, 'BIT 0,E'    ),
+    (BIT_144  , 2, 'BIT 0,H'    ),(BIT_145  , 2, 'BIT 0,L'    ),(BIT_146  , 2, 'BIT 0,(HL)' ),(BIT_147  , 2, 'BIT 0,A'    ),
+    (BIT_148  , 2, 'BIT 1,B'    ),(BIT_149  , 2, 'BIT 1,C'    ),(BIT_14A  , 2, 'BIT 1,D'    ),(BIT_14B  , 2, 'BIT 1,E'    ),
+    (BIT_14C  , 2, 'BIT 1,H'    ),(BIT_14D  , 2, 'BIT 1,L'    ),(BIT_14E  , 2, 'BIT 1,(HL)' ),(BIT_14F  , 2, 'BIT 1,A'    ),
+    # 15x
+    (BIT_150  , 2, 'BIT 2,B'    ),(BIT_151  , 2, 'BIT 2,C'    ),(BIT_152  , 2, 'BIT 2,D'    ),(BIT_153  , 2, 'BIT 2,E'    ),
+    (BIT_154  , 2, 'BIT 2,H'    ),(BIT_155  , 2, 'BIT 2,L'    ),(BIT_156  , 2, 'BIT 2,(HL)' ),(BIT_157  , 2, 'BIT 2,A'    ),
+    (BIT_158  , 2, 'BIT 3,B'    ),(BIT_159  , 2, 'BIT 3,C'    ),(BIT_15A  , 2, 'BIT 3,D'    ),(BIT_15B  , 2, 'BIT 3,E'    ),
+    (BIT_15C  , 2, 'BIT 3,H'    ),(BIT_15D  , 2, 'BIT 3,L'    ),(BIT_15E  , 2, 'BIT 3,(HL)' ),(BIT_15F  , 2, 'BIT 3,A'    ),
+    # 16x
+    (BIT_160  , 2, 'BIT 4,B'    ),(BIT_161  , 2, 'BIT 4,C'    ),(BIT_162  , 2, 'BIT 4,D'    ),(BIT_163  , 2, 'BIT 4,E'    ),
+    (BIT_164  , 2, 'BIT 4,H'    ),(BIT_165  , 2, 'BIT 4,L'    ),(BIT_166  , 2, 'BIT 4,(HL)' ),(BIT_167  , 2, 'BIT 4,A'    ),
+    (BIT_168  , 2, 'BIT 5,B'    ),(BIT_169  , 2, 'BIT 5,C'    ),(BIT_16A  , 2, 'BIT 5,D'    ),(BIT_16B  , 2, 'BIT 5,E'    ),
+    (BIT_16C  , 2, 'BIT 5,H'    ),(BIT_16D  , 2, 'BIT 5,L'    ),(BIT_16E  , 2, 'BIT 5,(HL)' ),(BIT_16F  , 2, 'BIT 5,A'    ),
+    # 17x
+    (BIT_170  , 2, 'BIT 6,B'    ),(BIT_171  , 2, 'BIT 6,C'    ),(BIT_172  , 2, 'BIT 6,D'    ),(BIT_173  , 2, 'BIT 6,E'    ),
+    (BIT_174  , 2, 'BIT 6,H'    ),(BIT_175  , 2, 'BIT 6,L'    ),(BIT_176  , 2, 'BIT 6,(HL)' ),(BIT_177  , 2, 'BIT 6,A'    ),
+    (BIT_178  , 2, 'BIT 7,B'    ),(BIT_179  , 2, 'BIT 7,C'    ),(BIT_17A  , 2, 'BIT 7,D'    ),(BIT_17B  , 2, 'BIT 7,E'    ),
+    (BIT_17C  , 2, 'BIT 7,H'    ),(BIT_17D  , 2, 'BIT 7,L'    ),(BIT_17E  , 2, 'BIT 7,(HL)' ),(BIT_17F  , 2, 'BIT 7,A'    ),
+    # 18x
+    (RES_180  , 2, 'RES 0,B'    ),(RES_181  , 2, 'RES 0,C'    ),(RES_182  , 2, 'RES 0,D'    ),(RES_183  , 2, 'RES 0,E'    ),
+    (RES_184  , 2, 'RES 0,H'    ),(RES_185  , 2, 'RES 0,L'    ),(RES_186  , 2, 'RES 0,(HL)' ),(RES_187  , 2, 'RES 0,A'    ),
+    (RES_188  , 2, 'RES 1,B'    ),(RES_189  , 2, 'RES 1,C'    ),(RES_18A  , 2, 'RES 1,D'    ),(RES_18B  , 2, 'RES 1,E'    ),
+    (RES_18C  , 2, 'RES 1,H'    ),(RES_18D  , 2, 'RES 1,L'    ),(RES_18E  , 2, 'RES 1,(HL)' ),(RES_18F  , 2, 'RES 1,A'    ),
+    # 19x
+    (RES_190  , 2, 'RES 2,B'    ),(RES_191  , 2, 'RES 2,C'    ),(RES_192  , 2, 'RES 2,D'    ),(RES_193  , 2, 'RES 2,E'    ),
+    (RES_194  , 2, 'RES 2,H'    ),(RES_195  , 2, 'RES 2,L'    ),(RES_196  , 2, 'RES 2,(HL)' ),(RES_197  , 2, 'RES 2,A'    ),
+    (RES_198  , 2, 'RES 3,B'    ),(RES_199  , 2, 'RES 3,C'    ),(RES_19A  , 2, 'RES 3,D'    ),(RES_19B  , 2, 'RES 3,E'    ),
+    (RES_19C  , 2, 'RES 3,H'    ),(RES_19D  , 2, 'RES 3,L'    ),(RES_19E  , 2, 'RES 3,(HL)' ),(RES_19F  , 2, 'RES 3,A'    ),
+    # 1Ax
+    (RES_1A0  , 2, 'RES 4,B'    ),(RES_1A1  , 2, 'RES 4,C'    ),(RES_1A2  , 2, 'RES 4,D'    ),(RES_1A3  , 2, 'RES 4,E'    ),
+    (RES_1A4  , 2, 'RES 4,H'    ),(RES_1A5  , 2, 'RES 4,L'    ),(RES_1A6  , 2, 'RES 4,(HL)' ),(RES_1A7  , 2, 'RES 4,A'    ),
+    (RES_1A8  , 2, 'RES 5,B'    ),(RES_1A9  , 2, 'RES 5,C'    ),(RES_1AA  , 2, 'RES 5,D'    ),(RES_1AB  , 2, 'RES 5,E'    ),
+    (RES_1AC  , 2, 'RES 5,H'    ),(RES_1AD  , 2, 'RES 5,L'    ),(RES_1AE  , 2, 'RES 5,(HL)' ),(RES_1AF  , 2, 'RES 5,A'    ),
+    # 1Bx
+    (RES_1B0  , 2, 'RES 6,B'    ),(RES_1B1  , 2, 'RES 6,C'    ),(RES_1B2  , 2, 'RES 6,D'    ),(RES_1B3  , 2, 'RES 6,E'    ),
+    (RES_1B4  , 2, 'RES 6,H'    ),(RES_1B5  , 2, 'RES 6,L'    ),(RES_1B6  , 2, 'RES 6,(HL)' ),(RES_1B7  , 2, 'RES 6,A'    ),
+    (RES_1B8  , 2, 'RES 7,B'    ),(RES_1B9  , 2, 'RES 7,C'    ),(RES_1BA  , 2, 'RES 7,D'    ),(RES_1BB  , 2, 'RES 7,E'    ),
+    (RES_1BC  , 2, 'RES 7,H'    ),(RES_1BD  , 2, 'RES 7,L'    ),(RES_1BE  , 2, 'RES 7,(HL)' ),(RES_1BF  , 2, 'RES 7,A'    ),
+    # 1Cx
+    (SET_1C0  , 2, 'SET 0,B'    ),(SET_1C1  , 2, 'SET 0,C'    ),(SET_1C2  , 2, 'SET 0,D'    ),(SET_1C3  , 2, 'SET 0,E'    ),
+    (SET_1C4  , 2, 'SET 0,H'    ),(SET_1C5  , 2, 'SET 0,L'    ),(SET_1C6  , 2, 'SET 0,(HL)' ),(SET_1C7  , 2, 'SET 0,A'    ),
+    (SET_1C8  , 2, 'SET 1,B'    ),(SET_1C9  , 2, 'SET 1,C'    ),(SET_1CA  , 2, 'SET 1,D'    ),(SET_1CB  , 2, 'SET 1,E'    ),
+    (SET_1CC  , 2, 'SET 1,H'    ),(SET_1CD  , 2, 'SET 1,L'    ),(SET_1CE  , 2, 'SET 1,(HL)' ),(SET_1CF  , 2, 'SET 1,A'    ),
+    # 1Dx
+    (SET_1D0  , 2, 'SET 2,B'    ),(SET_1D1  , 2, 'SET 2,C'    ),(SET_1D2  , 2, 'SET 2,D'    ),(SET_1D3  , 2, 'SET 2,E'    ),
+    (SET_1D4  , 2, 'SET 2,H'    ),(SET_1D5  , 2, 'SET 2,L'    ),(SET_1D6  , 2, 'SET 2,(HL)' ),(SET_1D7  , 2, 'SET 2,A'    ),
+    (SET_1D8  , 2, 'SET 3,B'    ),(SET_1D9  , 2, 'SET 3,C'    ),(SET_1DA  , 2, 'SET 3,D'    ),(SET_1DB  , 2, 'SET 3,E'    ),
+    (SET_1DC  , 2, 'SET 3,H'    ),(SET_1DD  , 2, 'SET 3,L'    ),(SET_1DE  , 2, 'SET 3,(HL)' ),(SET_1DF  , 2, 'SET 3,A'    ),
+    # 1Ex
+    (SET_1E0  , 2, 'SET 4,B'    ),(SET_1E1  , 2, 'SET 4,C'    ),(SET_1E2  , 2, 'SET 4,D'    ),(SET_1E3  , 2, 'SET 4,E'    ),
+    (SET_1E4  , 2, 'SET 4,H'    ),(SET_1E5  , 2, 'SET 4,L'    ),(SET_1E6  , 2, 'SET 4,(HL)' ),(SET_1E7  , 2, 'SET 4,A'    ),
+    (SET_1E8  , 2, 'SET 5,B'    ),(SET_1E9  , 2, 'SET 5,C'    ),(SET_1EA  , 2, 'SET 5,D'    ),(SET_1EB  , 2, 'SET 5,E'    ),
+    (SET_1EC  , 2, 'SET 5,H'    ),(SET_1ED  , 2, 'SET 5,L'    ),(SET_1EE  , 2, 'SET 5,(HL)' ),(SET_1EF  , 2, 'SET 5,A'    ),
+    # 1Fx
+    (SET_1F0  , 2, 'SET 6,B'    ),(SET_1F1  , 2, 'SET 6,C'    ),(SET_1F2  , 2, 'SET 6,D'    ),(SET_1F3  , 2, 'SET 6,E'    ),
+    (SET_1F4  , 2, 'SET 6,H'    ),(SET_1F5  , 2, 'SET 6,L'    ),(SET_1F6  , 2, 'SET 6,(HL)' ),(SET_1F7  , 2, 'SET 6,A'    ),
+    (SET_1F8  , 2, 'SET 7,B'    ),(SET_1F9  , 2, 'SET 7,C'    ),(SET_1FA  , 2, 'SET 7,D'    ),(SET_1FB  , 2, 'SET 7,E'    ),
+    (SET_1FC  , 2, 'SET 7,H'    ),(SET_1FD  , 2, 'SET 7,L'    ),(SET_1FE  , 2, 'SET 7,(HL)' ),(SET_1FF  , 2, 'SET 7,A'    )
+)